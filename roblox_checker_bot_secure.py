@@ -1,27 +1,120 @@
+import time
+STARTUP_STARTED = time.perf_counter()   # startup timing is reported in on_ready
+
+import aiohttp
 import discord
-from discord.ext import commands
+from discord.ext import commands, tasks
 from discord import app_commands
-import requests
+import importlib
 import re
-import csv
 import io
+import json
+import math
+import operator
+import codecs
+import contextvars
+import itertools
+import mmap
+import struct
+import hashlib
+import asyncio
+import socket
+import socketserver
+import sys
+import threading
+from array import array
+from bisect import bisect_left, insort
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor, wait as wait_futures
+from contextlib import contextmanager
 from datetime import datetime, timedelta
+from difflib import SequenceMatcher
 from typing import Optional, List, Dict
+from urllib.parse import urlsplit
 import os
-from dotenv import load_dotenv
 
-load_dotenv()
+
+class LazyModule:
+    """
+    Imports `name` on first attribute access instead of at startup. Unlike
+    importlib's LazyLoader (before Python 3.12.3), several threads may touch
+    it first at once — the blacklist sources load in parallel.
+    """
+
+    def __init__(self, name: str):
+        self._name   = name
+        self._module = None
+        self._lock   = threading.Lock()
+
+    def __getattr__(self, attr: str):
+        if self._module is None:
+            with self._lock:
+                if self._module is None:
+                    self._module = importlib.import_module(self._name)
+        return getattr(self._module, attr)
+
+
+def lazy_import(name: str):
+    """Import `name` on first use instead of at startup."""
+    return sys.modules.get(name) or LazyModule(name)
+
+
+# Only needed once a lookup, sheet fetch or history query actually runs
+requests = lazy_import("requests")
+csv      = lazy_import("csv")
+sqlite3  = lazy_import("sqlite3")
+
+# Optional — bulk re-scoring (ProfileColumns) runs on NumPy when it's installed
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Not on Windows — there the JSON stores skip the cross-process lock (one process per file)
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# Deployments configured through real environment variables have no .env to read
+if os.path.exists(".env"):
+    from dotenv import load_dotenv
+    load_dotenv()
+
+# ── Sharding ───────────────────────────────────────────────────────────────────
+# BOT_SHARD_MODE=auto runs every shard in this process (AutoShardedBot).
+# To split across processes, give each one SHARD_COUNT and its own SHARD_IDS
+# (e.g. "0,1") and point them all at one sidecar (`--sidecar`) via ROBLOX_SIDECAR
+# so the Roblox cache, rate limit and blacklist refresh are shared.
+BOT_SHARD_MODE = os.getenv("BOT_SHARD_MODE", "").lower()
+SHARD_COUNT    = int(os.getenv("SHARD_COUNT", "0") or 0)
+SHARD_IDS      = [int(i) for i in os.getenv("SHARD_IDS", "").split(",") if i.strip()]
+ROBLOX_SIDECAR = os.getenv("ROBLOX_SIDECAR", "")   # host:port of the sidecar
+
+# Files written by this process get a per-process suffix when split by SHARD_IDS
+PROCESS_TAG = f".shard{'-'.join(map(str, SHARD_IDS))}" if SHARD_IDS else ""
 
 intents = discord.Intents.default()
 intents.message_content = True
-bot = commands.Bot(command_prefix='!', intents=intents)
+if BOT_SHARD_MODE == "auto" or SHARD_COUNT:
+    bot = commands.AutoShardedBot(
+        command_prefix='!',
+        intents=intents,
+        shard_count=SHARD_COUNT or None,
+        shard_ids=SHARD_IDS or None,
+    )
+else:
+    bot = commands.Bot(command_prefix='!', intents=intents)
 
 # ── Roblox API endpoints ───────────────────────────────────────────────────────
 ROBLOX_USER_API        = "https://users.roblox.com/v1/users/{}"
 ROBLOX_FRIENDS_API     = "https://friends.roblox.com/v1/users/{}/friends"
 ROBLOX_GROUPS_API      = "https://groups.roblox.com/v2/users/{}/groups/roles"
+ROBLOX_GROUPS_BULK_API = "https://groups.roblox.com/v2/groups?groupIds={}"
 ROBLOX_BADGES_API      = "https://badges.roblox.com/v1/users/{}/badges"
+ROBLOX_BADGE_DATES_API = "https://badges.roblox.com/v1/users/{}/badges/awarded-dates?badgeIds={}"
 ROBLOX_USERNAME_SEARCH = "https://users.roblox.com/v1/users/search?keyword={}&limit=100"
+ROBLOX_NAME_HISTORY    = "https://users.roblox.com/v1/users/{}/username-history?limit=100&sortOrder=Desc"
 ROBLOX_PROFILE_URL     = "https://www.roblox.com/users/{}/profile"
 
 # ── Blacklist sources ──────────────────────────────────────────────────────────
@@ -55,6 +148,250 @@ GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY", "")
 CUSA_GROUP_ID   = "4219097"
 CUSA_GROUP_NAME = "CUSA United States Military"
 
+# ── Roblox data cache ──────────────────────────────────────────────────────────
+# User info, friends and groups are reused until this many seconds have passed
+ROBLOX_CACHE_TTL = 15 * 60
+
+# Usernames / display names already resolved map straight to their user, no request
+NAME_CACHE_TTL  = 6 * 60 * 60
+NAME_CACHE_SIZE = 20000
+
+# Autocomplete for `user` arguments searches blacklist entries plus up to this
+# many other names seen in Roblox responses (targets, friends, search results)
+NAME_INDEX_SIZE = 200000
+
+# Usernames within this many edits (insert / delete / substitute / swap) of a
+# blacklisted username are flagged as lookalikes. Names shorter than
+# FUZZY_MIN_LENGTH are never fuzzy-matched, and names shorter than
+# FUZZY_FULL_LENGTH allow only one edit, so short names don't match everything.
+FUZZY_MAX_DISTANCE  = 2
+FUZZY_MIN_LENGTH    = 4
+FUZZY_FULL_LENGTH   = 8
+FUZZY_PREFIX_LENGTH = 7   # deletes are indexed over this many leading characters
+
+# Blocking Roblox calls made off the event loop share this many worker threads
+ROBLOX_WORKERS = 8
+
+# Alt candidates from the username search are ranked by name similarity,
+# how close to the target they were created and mutual friends already known.
+# Creation dates of the top ALT_ENRICH_LIMIT are fetched side by side for at
+# most ALT_ENRICH_BUDGET seconds; the rest are placed by user ID, which Roblox
+# assigns in creation order. Candidates scoring under ALT_MIN_SCORE are dropped.
+ALT_ENRICH_LIMIT     = 5
+ALT_ENRICH_BUDGET    = 2.0
+ALT_CREATION_DAYS    = 30     # created this many days apart halves the creation score
+ALT_MIN_SCORE        = 0.45
+ALT_WEIGHTS          = {'name': 0.5, 'created': 0.35, 'mutual': 0.15}
+
+# Badges are read newest award first, BADGE_PAGE_SIZE at a time, until the
+# recent-activity window is passed or BADGE_PAGE_CAP pages have been read;
+# past that the total is shown as "N+"
+BADGE_PAGE_SIZE   = 100
+BADGE_PAGE_CAP    = 3
+BADGE_RECENT_DAYS = 90
+
+# ── Roblox endpoint health ─────────────────────────────────────────────────────
+# Each Roblox host gets a circuit breaker: once enough of its recent requests
+# fail, calls fail fast for a cooldown, then a single probe tests recovery.
+# Meanwhile expired cache entries are served (marked stale) and refreshed in
+# the background.
+ROBLOX_TIMEOUT       = 10            # seconds per request
+ROBLOX_STALE_TTL     = 6 * 60 * 60   # how long past expiry cached data may still be served
+BREAKER_WINDOW       = 20            # recent requests per endpoint considered
+BREAKER_MIN_FAILURES = 5
+BREAKER_ERROR_RATE   = 0.5           # failing share of the window that opens the breaker
+BREAKER_COOLDOWN     = 30            # seconds open before a probe request is let through
+
+# ── Lookup scheduler ───────────────────────────────────────────────────────────
+# Outbound Roblox requests are granted interactive → batch → background. Within
+# a class the guild, then moderator, served least so far goes next. Lookups
+# that can't finish before the interaction expires are dropped.
+LOOKUP_SLOTS               = 4         # Roblox requests in flight at once
+INTERACTION_LIFETIME       = 15 * 60   # seconds a deferred interaction accepts followups
+INTERACTIVE_REQUEST_BUDGET = 30        # an interactive command's lookups beyond this run as batch
+
+# ── Watchlist sweeper ──────────────────────────────────────────────────────────
+# Linked Roblox IDs are re-checked in the background; pass → fail flips are
+# posted to WATCHLIST_ALERT_CHANNEL_ID (or the channel the member was added from)
+WATCHLIST_PATH             = os.getenv("WATCHLIST_PATH", f"watchlist{PROCESS_TAG}.json")
+WATCHLIST_ALERT_CHANNEL_ID = int(os.getenv("WATCHLIST_ALERT_CHANNEL_ID", "0") or 0)
+SWEEP_INTERVAL_MINUTES     = 5
+SWEEP_BUDGET               = 20    # max members re-checked per sweep
+SWEEP_MEMBER_DELAY         = 2.0   # seconds between members, keeps the sweeper low priority
+
+# Rule inputs of evaluated users are kept column-wise for bulk re-scoring after
+# a rule or blacklist change; past this many users, new ones aren't added
+PROFILE_COLUMNS_SIZE = 100000
+
+# ── Pass/fail rules ────────────────────────────────────────────────────────────
+# Per-guild overrides live in GUILD_RULES_PATH. A disabled rule adds no factor
+# and its data (friends, groups, alt search, CUSA join date) is not fetched;
+# `fail` decides whether a hit fails the check or is only listed as a factor.
+GUILD_RULES_PATH = os.getenv("GUILD_RULES_PATH", "guild_rules.json")
+DEFAULT_RULES = {
+    'alts':      {'enabled': True, 'fail': False},
+    'groups':    {'enabled': True, 'fail': True},
+    'dhs':       {'enabled': True, 'fail': True},
+    'hor':       {'enabled': True, 'fail': True},
+    'senate':    {'enabled': True, 'fail': True},
+    'friends':   {'enabled': True, 'fail': True,  'min': 15},
+    'account':   {'enabled': True, 'fail': True,  'min': 6},
+    'cusa':      {'enabled': True, 'fail': False, 'min': 3},
+    'lookalike': {'enabled': True, 'fail': False},
+    'badges':    {'enabled': True, 'fail': False, 'min': 10},
+}
+
+# ── Relationship graph ─────────────────────────────────────────────────────────
+# Friend and group edges seen during checks, for "who knows this user" lookups.
+# Past the caps, the least recently recorded lists and names are dropped on save.
+GRAPH_PATH      = os.getenv("GRAPH_PATH", f"relationship_graph{PROCESS_TAG}.json")
+GRAPH_MAX_LISTS = 20000    # friend lists, and separately group lists
+GRAPH_MAX_NAMES = 100000
+
+# ── Sidecar ────────────────────────────────────────────────────────────────────
+# The sidecar owns blacklist refreshes and writes this snapshot; workers load it
+BLACKLIST_SNAPSHOT_PATH    = os.getenv("BLACKLIST_SNAPSHOT_PATH", "blacklist_snapshot.bin")
+BLACKLIST_REFRESH_MINUTES  = 30
+SNAPSHOT_POLL_SECONDS      = 60
+SIDECAR_CACHE_SIZE         = 50000
+SIDECAR_RATE_PER_SECOND    = 10.0   # Roblox requests per second across all workers
+SIDECAR_RATE_BURST         = 20
+SIDECAR_CONNECT_TIMEOUT    = 1.0    # seconds; a sidecar that doesn't accept by then counts as down
+SIDECAR_RETRY_SECONDS      = 10     # while down, calls fail fast instead of reconnecting
+
+# ── Friend check ───────────────────────────────────────────────────────────────
+# Each target's last scan (friend IDs, their group IDs, past usernames and hits)
+# is kept so a repeat /friend-check only fetches new friends. Stored group lists
+# older than FRIEND_SCAN_MAX_AGE are refetched.
+FRIEND_SCANS_PATH   = os.getenv("FRIEND_SCANS_PATH", f"friend_scans{PROCESS_TAG}.json")
+FRIEND_SCAN_MAX_AGE = 7 * 24 * 60 * 60
+FRIEND_SCAN_TARGETS = 1000   # targets kept; the least recently scanned are dropped
+
+# Results are paged so any scan fits one embed: PAGE_SIZE lines of at most
+# LINE_LIMIT characters stay under the 4096-character description limit
+FRIEND_CHECK_PAGE_SIZE  = 15
+FRIEND_CHECK_LINE_LIMIT = 250
+
+# ── Check history ──────────────────────────────────────────────────────────────
+# Every /background-check result is appended here (SQLite in WAL mode, so
+# shard processes can share one file) and can be looked up without Roblox calls
+HISTORY_PATH  = os.getenv("HISTORY_PATH", "check_history.db")
+HISTORY_LIMIT = 10   # recent checks listed by /history
+
+# ── Command sync ───────────────────────────────────────────────────────────────
+# Slash commands are only re-synced when their definitions change (compared by
+# fingerprint). DEV_GUILD_ID syncs to that one guild instead, which applies
+# instantly — for testing command changes.
+COMMAND_FINGERPRINT_PATH = os.getenv("COMMAND_FINGERPRINT_PATH", "command_fingerprint.json")
+DEV_GUILD_ID             = int(os.getenv("DEV_GUILD_ID", "0") or 0)
+FORCE_COMMAND_SYNC       = os.getenv("FORCE_COMMAND_SYNC", "").lower() in ("1", "true", "yes")
+
+# ── HTTP interactions ──────────────────────────────────────────────────────────
+# `--http` serves interactions that Discord posts to the app's Interactions
+# Endpoint URL instead of connecting to the gateway. Workers hold no session,
+# so any number can sit behind a load balancer; give them one ROBLOX_SIDECAR to
+# share the Roblox cache and blacklist snapshot. `--http-send` posts signed
+# test interactions to a local worker.
+DISCORD_PUBLIC_KEY     = os.getenv("DISCORD_PUBLIC_KEY", "")   # Developer Portal → General Information
+DISCORD_API_BASE       = os.getenv("DISCORD_API_BASE", "https://discord.com/api/v10").rstrip("/")
+HTTP_INTERACTIONS_HOST = os.getenv("HTTP_INTERACTIONS_HOST", "0.0.0.0")
+HTTP_INTERACTIONS_PORT = int(os.getenv("HTTP_INTERACTIONS_PORT", "8080") or 8080)
+HTTP_INTERACTIONS_PATH = os.getenv("HTTP_INTERACTIONS_PATH", "/interactions")
+HTTP_TEST_SIGNING_KEY  = os.getenv("HTTP_TEST_SIGNING_KEY", "")   # hex Ed25519 seed used by --http-send
+HTTP_DEFER_AFTER       = 2.5   # seconds; Discord drops interactions not answered within 3
+HTTP_SIGNATURE_MAX_AGE = 300   # seconds; older signed timestamps are treated as replays
+HTTP_SEND_IDLE         = 10    # seconds --http-send keeps listening for webhook calls
+# Set on exactly one worker: it sweeps the shared watchlist and posts alerts over REST
+HTTP_WATCH_SWEEPER     = os.getenv("HTTP_WATCH_SWEEPER", "").lower() in ("1", "true", "yes")
+
+# ── Network scan ───────────────────────────────────────────────────────────────
+NETWORK_SCAN_MAX_DEPTH    = 3
+NETWORK_SCAN_MAX_REQUESTS = 120   # uncached friend-list fetches per scan
+NETWORK_SCAN_BUDGET       = 8.0   # seconds before the scan reports what it has
+
+
+# ── Group blacklist doc parsing ────────────────────────────────────────────────
+DOC_CHUNK_SIZE    = 16 * 1024
+DOC_MIN_ID_DIGITS = 6     # shorter numbers in the doc are dates, counts, etc.
+DOC_MAX_HEADER    = 80    # longer ID-less lines are prose, not section headers
+DOC_NAME_STRIP    = " \t-–—|:•*·,;()[]<>\"'"
+
+
+def _is_word_char(c: str) -> bool:
+    return c.isalnum() or c == '_'
+
+
+def _doc_line_ids(line: str) -> List[tuple]:
+    """(start, end) spans of standalone runs of DOC_MIN_ID_DIGITS+ digits."""
+    spans, i, n = [], 0, len(line)
+    while i < n:
+        if not line[i].isdecimal():
+            i += 1
+            continue
+        j = i
+        while j < n and line[j].isdecimal():
+            j += 1
+        if (j - i >= DOC_MIN_ID_DIGITS and
+                (i == 0 or not _is_word_char(line[i - 1])) and
+                (j == n or not _is_word_char(line[j]))):
+            spans.append((i, j))
+        i = j
+    return spans
+
+
+def _doc_group_name(line: str, start: int, end: int) -> Optional[str]:
+    """Best-effort group name from the text around an ID on its line."""
+    # .../groups/<id>/<Group-Name> or /communities/<id>/<Group-Name>
+    if line[start - 1:start] == '/' and line[end:end + 1] == '/':
+        slug_end = end + 1
+        while slug_end < len(line) and not line[slug_end].isspace() and line[slug_end] not in '/?#':
+            slug_end += 1
+        slug = line[end + 1:slug_end].replace('-', ' ').strip()
+        if slug:
+            return slug
+
+    # Otherwise whatever isn't the ID or a link, e.g. "Group Name - 1234567"
+    words = [w for w in (line[:start] + " " + line[end:]).split() if '://' not in w and 'roblox.com' not in w]
+    name  = " ".join(words).strip(DOC_NAME_STRIP)
+    return name or None
+
+
+def iter_doc_groups(chunks):
+    """
+    Stream group records out of the blacklist doc's text export.
+
+    `chunks` is any iterable of bytes (e.g. `Response.iter_content`). Lines
+    are decoded incrementally, so memory stays at one chunk plus one line.
+    Lines without a group ID that are short enough count as section
+    headers. Yields {'group_id', 'name', 'section'} for every ID found.
+    """
+    decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+    section = None
+    pending = ''
+
+    def parse(line: str):
+        nonlocal section
+        line  = line.strip().lstrip('\ufeff')
+        spans = _doc_line_ids(line)
+        if not spans:
+            if line and len(line) <= DOC_MAX_HEADER:
+                section = line.strip(DOC_NAME_STRIP) or section
+            return
+        for start, end in spans:
+            yield {
+                'group_id': int(line[start:end]),
+                'name':     _doc_group_name(line, start, end) if len(spans) == 1 else None,
+                'section':  section,
+            }
+
+    for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split('\n')
+        for line in lines:
+            yield from parse(line)
+    pending += decoder.decode(b'', final=True)
+    yield from parse(pending)
+
 
 # ── Helper to normalise appealable values ──────────────────────────────────────
 def fmt_appealable(value: str) -> str:
@@ -66,9 +403,1468 @@ def fmt_appealable(value: str) -> str:
     return value or 'Not specified'
 
 
-class RobloxChecker:
+# ── Shared state files ─────────────────────────────────────────────────────────
+# --http workers have no shard IDs, so they all read and write the same JSON
+# stores. Each store re-reads its file when the stamp changes and merges it
+# with its own edits under the lock before writing.
+def file_stamp(path: str) -> Optional[tuple]:
+    """Identity of the file's current contents — os.replace gives every save a new inode."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_ino, st.st_mtime_ns, st.st_size
+
+
+@contextmanager
+def locked_file(path: str):
+    """Hold an exclusive lock on `path`.lock across processes while its file is read, merged and replaced."""
+    if fcntl is None:
+        yield
+        return
+    with open(f"{path}.lock", 'a') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def read_json(path: str):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+class TTLCache:
+    """
+    Bounded in-memory cache whose entries expire after `ttl` seconds.
+
+    Expired entries are kept for another `stale_ttl` seconds, only for
+    `get_stale` — the fallback when a refetch fails.
+    """
+
+    def __init__(self, ttl: float, max_size: int = 5000, stale_ttl: float = 0):
+        self.ttl       = ttl
+        self.stale_ttl = stale_ttl
+        self.max_size  = max_size
+        self._data     = OrderedDict()  # key -> (stored_at, value)
+
+    def get(self, key):
+        item = self._data.get(key)
+        if item is None:
+            return None
+        stored_at, value = item
+        age = time.time() - stored_at
+        if age > self.ttl:
+            if age > self.ttl + self.stale_ttl:
+                del self._data[key]
+            return None
+        return value
+
+    def get_stale(self, key) -> Optional[tuple]:
+        """(value, stored_at) for an entry, even past `ttl` as long as it is within `stale_ttl`."""
+        item = self._data.get(key)
+        if item is None or time.time() - item[0] > self.ttl + self.stale_ttl:
+            return None
+        return item[1], item[0]
+
+    def stored_at(self, key) -> Optional[float]:
+        """When a live entry was stored — used to tell whether data behind a verdict changed."""
+        item = self._data.get(key)
+        if item is None or time.time() - item[0] > self.ttl:
+            return None
+        return item[0]
+
+    def set(self, key, value):
+        self._data[key] = (time.time(), value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+
+    def invalidate(self, key):
+        self._data.pop(key, None)
+
+
+class RelationshipGraph:
+    """
+    Friend and group edges gathered during checks, persisted as JSON.
+
+    Forward adjacency (target → friends, user → groups) and the reverse
+    indexes (friend → targets, group → users) are sorted `array('q')` per
+    node, so "who has X as a friend" is a single dict lookup. Nodes set
+    here since the last save win over the file when merging in what other
+    processes saved. Forward dicts are kept in recency order, so a save
+    drops the oldest lists past GRAPH_MAX_LISTS.
+    """
+
+    def __init__(self, path: str):
+        self.path          = path
+        self.friends       = {}  # target_id -> array of friend ids
+        self.groups        = {}  # user_id   -> array of group ids
+        self.friend_of     = {}  # friend_id -> array of target ids
+        self.group_members = {}  # group_id  -> array of user ids
+        self.names         = {}  # user_id   -> last seen username
+        self.dirty         = False
+        self.stamp         = None
+        self._changed      = {'friends': set(), 'groups': set(), 'names': set()}  # nodes set since the last save
+        self._lock         = threading.RLock()  # edges are also written from worker threads
+        self._save_lock    = threading.Lock()   # saves run on the worker pool
+        self.load()
+
+    @staticmethod
+    def _link(index: Dict, key: int, value: int):
+        ids = index.get(key)
+        if ids is None:
+            index[key] = array('q', (value,))
+            return
+        i = bisect_left(ids, value)
+        if i == len(ids) or ids[i] != value:
+            ids.insert(i, value)
+
+    @staticmethod
+    def _unlink(index: Dict, key: int, value: int):
+        ids = index.get(key)
+        if ids is None:
+            return
+        i = bisect_left(ids, value)
+        if i < len(ids) and ids[i] == value:
+            del ids[i]
+            if not ids:
+                del index[key]
+
+    def _replace(self, forward: Dict, reverse: Dict, node: int, targets, changed: Optional[set] = None) -> bool:
+        new = array('q', sorted(set(targets)))
+        with self._lock:
+            old = forward.pop(node, array('q'))   # re-inserted below: dict order is recency order
+            if new == old:
+                if len(old):
+                    forward[node] = old
+                return False
+            old_set, new_set = set(old), set(new)
+            for t in old_set - new_set:
+                self._unlink(reverse, t, node)
+            for t in new_set - old_set:
+                self._link(reverse, t, node)
+            forward[node] = new
+            self.dirty    = True
+            if changed is not None:
+                changed.add(node)
+        return True
+
+    def set_friends(self, user_id: int, friend_ids):
+        self._replace(self.friends, self.friend_of, int(user_id), (int(f) for f in friend_ids),
+                      self._changed['friends'])
+
+    def set_groups(self, user_id: int, group_ids):
+        self._replace(self.groups, self.group_members, int(user_id), (int(g) for g in group_ids),
+                      self._changed['groups'])
+
+    def set_name(self, user_id: int, username: str):
+        if username and self.names.get(int(user_id)) != username:
+            with self._lock:
+                self.names.pop(int(user_id), None)
+                self.names[int(user_id)] = username
+                self._changed['names'].add(int(user_id))
+                self.dirty = True
+
+    def friended_by(self, user_id: int) -> List[int]:
+        """Checked users that have `user_id` on their friends list."""
+        return list(self.friend_of.get(int(user_id), ()))
+
+    def members_of(self, group_id) -> List[int]:
+        """Checked users (targets or scanned friends) seen in `group_id`."""
+        return list(self.group_members.get(int(group_id), ()))
+
+    def load(self):
+        if not self.path:
+            return
+        self.stamp = file_stamp(self.path)
+        try:
+            data = read_json(self.path)
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            print(f"[Graph] Error loading {self.path}: {e}")
+            return
+
+        self._merge(data)
+        self.dirty = False
+        print(f"[Graph] Loaded {len(self.friends)} friend list(s), {len(self.groups)} group list(s)")
+
+    def _merge(self, data: Dict):
+        """Adopt the file's nodes, except those set here since the last save."""
+        changed = self._changed
+        with self._lock:
+            for uid, ids in data.get('friends', {}).items():
+                if int(uid) not in changed['friends']:
+                    self._replace(self.friends, self.friend_of, int(uid), ids)
+            for uid, ids in data.get('groups', {}).items():
+                if int(uid) not in changed['groups']:
+                    self._replace(self.groups, self.group_members, int(uid), ids)
+            for uid, name in data.get('names', {}).items():
+                if int(uid) not in changed['names']:
+                    self.names[int(uid)] = name
+
+    def _evict(self):
+        """Drop the least recently recorded lists and names past the caps. Callers hold self._lock."""
+        for forward, reverse in ((self.friends, self.friend_of), (self.groups, self.group_members)):
+            while len(forward) > GRAPH_MAX_LISTS:
+                node = next(iter(forward))
+                for t in forward.pop(node):
+                    self._unlink(reverse, t, node)
+        while len(self.names) > GRAPH_MAX_NAMES:
+            del self.names[next(iter(self.names))]
+
+    def refresh(self):
+        """Merge in edges other processes saved since this one last read or wrote the file."""
+        if not self.path:
+            return
+        stamp = file_stamp(self.path)
+        if stamp == self.stamp:
+            return
+        try:
+            data = read_json(self.path)
+        except Exception as e:
+            print(f"[Graph] Error reloading {self.path}: {e}")
+            return
+        with self._lock:
+            dirty = self.dirty
+            self._merge(data)
+            self.dirty = dirty
+        self.stamp = stamp
+
+    def save(self):
+        if not self.dirty or not self.path:
+            return
+        try:
+            with self._save_lock, locked_file(self.path):
+                self.refresh()
+                with self._lock:
+                    self._evict()
+                    data = {
+                        'friends': {uid: ids.tolist() for uid, ids in self.friends.items()},
+                        'groups':  {uid: ids.tolist() for uid, ids in self.groups.items()},
+                        'names':   dict(self.names),
+                    }
+                    self.dirty = False
+                    for nodes in self._changed.values():
+                        nodes.clear()
+                tmp = f"{self.path}.tmp"
+                with open(tmp, 'w', encoding='utf-8') as f:
+                    json.dump(data, f, separators=(',', ':'))
+                os.replace(tmp, self.path)
+                self.stamp = file_stamp(self.path)
+        except Exception as e:
+            print(f"[Graph] Error saving {self.path}: {e}")
+
+
+class RateLimiter:
+    """Token bucket; `reserve()` takes a token and says how long to wait for it."""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate    = rate
+        self.burst   = burst
+        self._tokens = float(burst)
+        self._last   = time.monotonic()
+        self._lock   = threading.Lock()
+
+    def reserve(self) -> float:
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+            self._last   = now
+            self._tokens -= 1
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+
+class EndpointUnavailable(Exception):
+    """A Roblox request was skipped because its endpoint's circuit breaker is open."""
+
+
+class CircuitBreaker:
+    """
+    Failure tracker for one Roblox endpoint over its last BREAKER_WINDOW requests.
+
+    Opens once failures reach BREAKER_ERROR_RATE (and BREAKER_MIN_FAILURES),
+    rejecting requests for BREAKER_COOLDOWN seconds. After that exactly one
+    probe request is let through: success closes the breaker, failure
+    re-opens it for another cooldown.
+    """
+
+    def __init__(self, name: str):
+        self.name      = name
+        self.failures  = deque(maxlen=BREAKER_WINDOW)   # True = failed request
+        self.opened_at = None
+        self.probing   = False
+        self._lock     = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if self.probing or time.monotonic() - self.opened_at < BREAKER_COOLDOWN:
+                return False
+            self.probing = True
+            return True
+
+    def record(self, ok: bool):
+        with self._lock:
+            if self.opened_at is not None:
+                # Only the probe's outcome counts while open
+                if not self.probing:
+                    return
+                self.probing = False
+                if ok:
+                    self.opened_at = None
+                    self.failures.clear()
+                    print(f"[Breaker] {self.name} recovered")
+                else:
+                    self.opened_at = time.monotonic()
+                return
+
+            self.failures.append(not ok)
+            failed = sum(self.failures)
+            if failed >= BREAKER_MIN_FAILURES and failed / len(self.failures) >= BREAKER_ERROR_RATE:
+                self.opened_at = time.monotonic()
+                print(f"[Breaker] {self.name} open — {failed}/{len(self.failures)} recent requests failed")
+
+
+# ── Lookup scheduler ───────────────────────────────────────────────────────────
+PRIORITY_INTERACTIVE = 0   # single-user commands a moderator is waiting on
+PRIORITY_BATCH       = 1   # friend checks, network scans
+PRIORITY_BACKGROUND  = 2   # watchlist sweeps, refreshes
+
+# Set per command task by `schedule_lookups`; `run_blocking` carries it into
+# the worker thread. None = background work with no deadline.
+lookup_context = contextvars.ContextVar('lookup_context', default=None)
+
+
+class LookupExpired(Exception):
+    """A lookup was dropped because it couldn't finish before its deadline."""
+
+
+class LookupScheduler:
+    """
+    Grants `slots` concurrent Roblox requests to waiting threads in priority
+    order, fair-queued per guild and moderator within a priority class.
+
+    A key that starts queueing begins at the lowest count among keys already
+    waiting, so a new moderator is served next without being able to starve
+    the ones already there. Request latency is tracked (EWMA) to drop
+    lookups that would finish after their context's deadline.
+    """
+
+    def __init__(self, slots: int):
+        self.slots   = slots
+        self.active  = 0
+        self.waiting = []    # waiter dicts, arrival order
+        self.served  = {}    # ('guild', id) / ('mod', id) -> requests granted while queued
+        self.latency = 0.5   # seconds per request, EWMA
+        self._seq    = itertools.count()
+        self._cond   = threading.Condition()
+
+    def _rank(self, waiter: Dict) -> tuple:
+        return (waiter['priority'], self.served.get(waiter['guild'], 0),
+                self.served.get(waiter['mod'], 0), waiter['seq'])
+
+    def _enqueue(self, waiter: Dict):
+        floor = min((self.served.get(k, 0) for w in self.waiting for k in (w['guild'], w['mod'])), default=0)
+        for key in (waiter['guild'], waiter['mod']):
+            self.served.setdefault(key, floor)
+        self.waiting.append(waiter)
+
+    def _dequeue(self, waiter: Dict):
+        self.waiting.remove(waiter)
+        queued = {k for w in self.waiting for k in (w['guild'], w['mod'])}
+        for key in (waiter['guild'], waiter['mod']):
+            if key not in queued:
+                self.served.pop(key, None)
+        self._cond.notify_all()
+
+    @contextmanager
+    def slot(self):
+        """Hold one request slot for the current `lookup_context`; may raise LookupExpired."""
+        ctx = lookup_context.get()
+        with self._cond:
+            if ctx is None:
+                priority, guild, mod, deadline = PRIORITY_BACKGROUND, None, None, None
+            else:
+                ctx['requests'] += 1
+                priority = ctx['priority']
+                if priority == PRIORITY_INTERACTIVE and ctx['requests'] > INTERACTIVE_REQUEST_BUDGET:
+                    priority = PRIORITY_BATCH
+                guild, mod, deadline = ctx['guild'], ctx['moderator'], ctx['deadline']
+
+            waiter = {'priority': priority, 'guild': ('guild', guild), 'mod': ('mod', mod),
+                      'seq': next(self._seq)}
+            self._enqueue(waiter)
+            while self.active >= self.slots or min(self.waiting, key=self._rank) is not waiter:
+                timeout = None
+                if deadline is not None:
+                    timeout = deadline - time.monotonic() - self.latency
+                    if timeout <= 0:
+                        self._dequeue(waiter)
+                        raise LookupExpired("lookup would finish after the interaction expires")
+                self._cond.wait(timeout)
+
+            self.served[waiter['guild']] += 1
+            self.served[waiter['mod']]   += 1
+            self.active += 1
+            self._dequeue(waiter)
+
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            with self._cond:
+                self.active  -= 1
+                self.latency  = 0.8 * self.latency + 0.2 * (time.monotonic() - started)
+                self._cond.notify_all()
+
+
+class SidecarClient:
+    """
+    Line-delimited JSON client for the local sidecar (see `run_sidecar`).
+
+    Each worker thread keeps one persistent connection. Any failure returns
+    None so callers degrade to uncached, unthrottled requests instead of
+    erroring; after a failure every call fails fast for SIDECAR_RETRY_SECONDS
+    rather than waiting on a sidecar that is down.
+    """
+
+    def __init__(self, address: str, timeout: float = 5.0):
+        host, _, port = address.rpartition(':')
+        self.address    = (host or '127.0.0.1', int(port))
+        self.timeout    = timeout
+        self.down_until = 0.0
+        self._local     = threading.local()
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            sock = socket.create_connection(self.address, timeout=SIDECAR_CONNECT_TIMEOUT)
+            conn = self._local.conn = (sock, sock.makefile('rwb'))
+        return conn
+
+    def call(self, op: str, timeout: Optional[float] = None, **fields) -> Optional[Dict]:
+        if time.monotonic() < self.down_until:
+            return None
+        try:
+            sock, stream = self._connection()
+            sock.settimeout(timeout or self.timeout)
+            stream.write(json.dumps({'op': op, **fields}).encode() + b'\n')
+            stream.flush()
+            line = stream.readline()
+            if not line:
+                raise ConnectionError("sidecar closed the connection")
+            return json.loads(line)
+        except Exception as e:
+            if time.monotonic() >= self.down_until:
+                print(f"[Sidecar] {op} failed: {e} — retrying in {SIDECAR_RETRY_SECONDS}s")
+            self.down_until  = time.monotonic() + SIDECAR_RETRY_SECONDS
+            self._local.conn = None
+            return None
+
+    def acquire(self):
+        """Block until the shared rate limit allows one more Roblox request."""
+        resp = self.call('acquire')
+        if resp and resp.get('wait'):
+            time.sleep(resp['wait'])
+
+
+class SidecarCache:
+    """
+    TTLCache-compatible view of the sidecar's shared Roblox cache.
+
+    While the sidecar can't be reached, entries go to a local TTLCache
+    instead, so data fetched directly still reads as fresh.
+    """
+
+    def __init__(self, client: SidecarClient):
+        self.client = client
+        self.local  = TTLCache(ROBLOX_CACHE_TTL, stale_ttl=ROBLOX_STALE_TTL)
+
+    @staticmethod
+    def _key(key) -> str:
+        return ":".join(map(str, key))
+
+    def get(self, key):
+        resp = self.client.call('get', key=self._key(key))
+        return resp.get('value') if resp else self.local.get(key)
+
+    def stored_at(self, key) -> Optional[float]:
+        resp = self.client.call('get', key=self._key(key))
+        return resp.get('stored_at') if resp else self.local.stored_at(key)
+
+    def get_stale(self, key) -> Optional[tuple]:
+        resp = self.client.call('get', key=self._key(key), stale=True)
+        if resp is None:
+            return self.local.get_stale(key)
+        if resp.get('value') is None:
+            return None
+        return resp['value'], resp['stored_at']
+
+    def set(self, key, value):
+        if self.client.call('set', key=self._key(key), value=value) is None:
+            self.local.set(key, value)
+
+    def invalidate(self, key):
+        self.local.invalidate(key)
+        self.client.call('invalidate', key=self._key(key))
+
+
+# ── Blacklist snapshot ─────────────────────────────────────────────────────────
+SOURCE_DHS    = 1
+SOURCE_HOR    = 2
+SOURCE_SENATE = 4
+FLAG_REMOVED  = 8
+
+SOURCE_NAMES = {
+    SOURCE_DHS:    'DHS Database',
+    SOURCE_HOR:    'HoR Database',
+    SOURCE_SENATE: 'Senate Database',
+}
+
+
+def _align8(n: int) -> int:
+    return (n + 7) & ~7
+
+
+def _name_hash(name: str) -> int:
+    return int.from_bytes(hashlib.blake2b(name.encode(), digest_size=8).digest(), 'little')
+
+
+class BlacklistSnapshot:
+    """
+    Immutable, memory-mapped blacklist snapshot.
+
+    File layout (host byte order, every section 8-byte aligned):
+      header   magic, version, generation, entry count, group count,
+               username table size, string table size
+      ids      uint64[n]    user IDs, sorted
+      records  n × 5 uint32 flags (source bits | FLAG_REMOVED) and string
+                            offsets for username, length, appealable, reason
+      hashes   uint64[t]    username hash table (open addressing) ...
+      slots    uint32[t]    ... pointing at record index + 1, 0 = empty
+      groups   uint64[g]    blacklisted group IDs, sorted
+      strings  interned uint16-length-prefixed UTF-8
+
+    Arrays are memoryview casts over the mapping, so opening a snapshot does
+    no parsing — lookups binary-search or probe the mapped pages directly.
+    """
+
+    MAGIC   = b'RBLSNAP\0'
+    VERSION = 1
+    HEADER  = struct.Struct('=8sIIIIII')
+    RECORD  = struct.Struct('=IIIII')
+    NONE    = 0xFFFFFFFF
+
+    def __init__(self, path: str):
+        with open(path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        buf = self._buf = memoryview(self._mm)
+
+        magic, version, self.generation, n, g, t, strings_len = self.HEADER.unpack_from(buf, 0)
+        if magic != self.MAGIC or version != self.VERSION:
+            raise ValueError(f"{path} is not a version {self.VERSION} blacklist snapshot")
+
+        off = self.HEADER.size
+        self._ids     = buf[off:off + 8 * n].cast('Q');  off += 8 * n
+        self._records = buf[off:off + self.RECORD.size * n]; off = _align8(off + self.RECORD.size * n)
+        self._hashes  = buf[off:off + 8 * t].cast('Q');  off += 8 * t
+        self._slots   = buf[off:off + 4 * t].cast('I');  off = _align8(off + 4 * t)
+        self._groups  = buf[off:off + 8 * g].cast('Q');  off += 8 * g
+        self._strings = buf[off:off + strings_len]
+        self._mask    = t - 1
+
+    # ── Writing ────────────────────────────────────────────────────────────────
+    @classmethod
+    def write(cls, path: str, generation: int, groups, sources):
+        """
+        Atomically write a snapshot.
+
+        `sources` is a list of (source bit, by_id dict, by_username dict) as
+        built by the fetch_* methods.
+        """
+        strings, blob = {}, bytearray()
+
+        def intern(value: Optional[str]) -> int:
+            if value is None:
+                return cls.NONE
+            if value not in strings:
+                data = value.encode()[:0xFFFF]
+                strings[value] = len(blob)
+                blob.extend(struct.pack('=H', len(data)))
+                blob.extend(data)
+            return strings[value]
+
+        rows = []
+        for bit, by_id, by_username in sources:
+            # name -> user ID rather than object identity: snapshot-backed sources build a new dict per access
+            indexed = {name: str(e.get('user_id')) for name, e in by_username.items()}
+            for uid, entry in by_id.items():
+                flags = bit | (FLAG_REMOVED if entry.get('removed') else 0)
+                name  = (entry.get('username') or '').lower()
+                rows.append((int(uid), flags, entry, indexed.get(name) == str(uid)))
+        rows.sort(key=lambda r: (r[0], r[1]))
+
+        n = len(rows)
+        t = 1
+        while t < 2 * n + 1:
+            t *= 2
+        ids     = array('Q', (r[0] for r in rows))
+        records = bytearray(cls.RECORD.size * n)
+        hashes  = array('Q', bytes(8 * t))
+        slots   = array('I', bytes(4 * t))
+
+        for i, (_, flags, entry, indexed) in enumerate(rows):
+            name = entry.get('username', '')
+            cls.RECORD.pack_into(
+                records, i * cls.RECORD.size, flags,
+                intern(name), intern(entry.get('length')),
+                intern(entry.get('appealable')), intern(entry.get('reason')),
+            )
+            if indexed and name:
+                h = _name_hash(name.lower())
+                slot = h & (t - 1)
+                while slots[slot]:
+                    slot = (slot + 1) & (t - 1)
+                hashes[slot] = h
+                slots[slot]  = i + 1
+
+        group_ids = array('Q', sorted({int(gid) for gid in groups if str(gid).isdigit()}))
+
+        def pad(out):
+            out.write(bytes(_align8(out.tell()) - out.tell()))
+
+        tmp = f"{path}.tmp"
+        with open(tmp, 'wb') as out:
+            out.write(cls.HEADER.pack(cls.MAGIC, cls.VERSION, generation, n, len(group_ids), t, len(blob)))
+            out.write(ids.tobytes())
+            out.write(records); pad(out)
+            out.write(hashes.tobytes())
+            out.write(slots.tobytes()); pad(out)
+            out.write(group_ids.tobytes())
+            out.write(blob)
+
+        # Read the file back before it replaces the last good snapshot
+        check = cls(tmp)
+        try:
+            if (len(check._ids) != n or len(check._groups) != len(group_ids) or
+                    any(check.entry(i)['user_id'] != str(rows[i][0]) for i in range(n))):
+                raise ValueError(f"{tmp} doesn't read back as written")
+        finally:
+            check.close()
+        os.replace(tmp, path)
+
+    # ── Reading ────────────────────────────────────────────────────────────────
+    def close(self):
+        for view in (self._ids, self._records, self._hashes, self._slots, self._groups, self._strings, self._buf):
+            view.release()
+        self._mm.close()
+
+    def _string(self, offset: int) -> Optional[str]:
+        if offset == self.NONE:
+            return None
+        (length,) = struct.unpack_from('=H', self._strings, offset)
+        return bytes(self._strings[offset + 2:offset + 2 + length]).decode()
+
+    def flags(self, i: int) -> int:
+        return self.RECORD.unpack_from(self._records, i * self.RECORD.size)[0]
+
+    def entry(self, i: int) -> Dict:
+        """Materialise record `i` as the same dict the fetch_* methods build."""
+        flags, name, length, appealable, reason = self.RECORD.unpack_from(self._records, i * self.RECORD.size)
+        source = next(bit for bit in SOURCE_NAMES if flags & bit)
+        entry  = {
+            'source':     SOURCE_NAMES[source],
+            'username':   self._string(name),
+            'user_id':    str(self._ids[i]),
+            'length':     self._string(length),
+            'appealable': self._string(appealable),
+        }
+        if reason != self.NONE:
+            entry['reason'] = self._string(reason)
+        if source == SOURCE_DHS:
+            entry['removed'] = bool(flags & FLAG_REMOVED)
+        return entry
+
+    def find_id(self, user_id: int, source: int) -> Optional[int]:
+        i = bisect_left(self._ids, user_id)
+        while i < len(self._ids) and self._ids[i] == user_id:
+            if self.flags(i) & source:
+                return i
+            i += 1
+        return None
+
+    def find_username(self, name: str, source: int) -> Optional[int]:
+        h    = _name_hash(name)
+        slot = h & self._mask
+        while self._slots[slot]:
+            i = self._slots[slot] - 1
+            if (self._hashes[slot] == h and self.flags(i) & source and
+                    (self._string(self.RECORD.unpack_from(self._records, i * self.RECORD.size)[1]) or '').lower() == name):
+                return i
+            slot = (slot + 1) & self._mask
+        return None
+
+    def indices(self, source: int):
+        return (i for i in range(len(self._ids)) if self.flags(i) & source)
+
+    def username_indices(self, source: int):
+        return (s - 1 for s in self._slots if s and self.flags(s - 1) & source)
+
+    def has_group(self, group_id: int) -> bool:
+        i = bisect_left(self._groups, group_id)
+        return i < len(self._groups) and self._groups[i] == group_id
+
+
+class SnapshotSource:
+    """Read-only dict-like view of one source — stands in for `*_by_id` / `*_by_username`."""
+
+    def __init__(self, snapshot: BlacklistSnapshot, source: int, by_username: bool = False):
+        self.snapshot    = snapshot
+        self.source      = source
+        self.by_username = by_username
+        self._len        = None
+
+    def _find(self, key) -> Optional[int]:
+        if self.by_username:
+            return self.snapshot.find_username(str(key), self.source)
+        return self.snapshot.find_id(int(key), self.source) if str(key).isdigit() else None
+
+    def _indices(self):
+        if self.by_username:
+            return self.snapshot.username_indices(self.source)
+        return self.snapshot.indices(self.source)
+
+    def get(self, key, default=None):
+        i = self._find(key)
+        return self.snapshot.entry(i) if i is not None else default
+
+    def __contains__(self, key) -> bool:
+        return self._find(key) is not None
+
+    def __len__(self) -> int:
+        if self._len is None:
+            self._len = sum(1 for _ in self._indices())
+        return self._len
+
+    def values(self):
+        return (self.snapshot.entry(i) for i in self._indices())
+
+    def items(self):
+        for i in self._indices():
+            entry = self.snapshot.entry(i)
+            yield (entry['username'].lower() if self.by_username else entry['user_id']), entry
+
+
+class SnapshotGroups:
+    """Read-only stand-in for `blacklisted_groups` backed by a snapshot."""
+
+    def __init__(self, snapshot: BlacklistSnapshot):
+        self.snapshot = snapshot
+
+    def __contains__(self, group_id) -> bool:
+        return str(group_id).isdigit() and self.snapshot.has_group(int(group_id))
+
+    def __len__(self) -> int:
+        return len(self.snapshot._groups)
+
+    def __iter__(self):
+        return (str(gid) for gid in self.snapshot._groups)
+
+
+# ── Rule engine ────────────────────────────────────────────────────────────────
+# Data each rule needs fetched, beyond the user info every check has
+RULE_NEEDS = {
+    'alts':    {'alts'},
+    'groups':  {'groups'},
+    'dhs':     {'names'},   # past usernames, for sheet entries recorded before a rename
+    'hor':     {'names'},
+    'senate':  {'names'},
+    'friends': {'friends'},
+    'cusa':    {'groups', 'cusa'},
+    'badges':  {'badges'},
+}
+ALL_NEEDS = frozenset({'alts', 'groups', 'names', 'friends', 'cusa', 'badges'})
+
+
+class CompiledRules:
+    """
+    A guild's rule config compiled once into a flat list of checks over a
+    risk profile's `signals`, plus the data fetches those checks need.
+    Applying it does no lookups, so re-scoring cached profiles is cheap.
+    """
+
+    def __init__(self, config: Dict):
+        self.config        = config
+        self.checks        = []
+        self.needs         = set()
+        self.verdict_needs = set()  # needs of the rules that can fail a check
+
+        for name, rule in config.items():
+            if not rule.get('enabled', True):
+                continue
+            self.checks.append(getattr(self, f"_compile_{name}")(rule, bool(rule.get('fail'))))
+            self.needs |= RULE_NEEDS.get(name, set())
+            if rule.get('fail'):
+                self.verdict_needs |= RULE_NEEDS.get(name, set())
+
+    def apply(self, profile: Dict) -> Dict:
+        signals   = profile['signals']
+        factors   = []
+        hard_fail = False
+        for check in self.checks:
+            hit = check(signals)
+            if hit:
+                factors.append(hit[0])
+                hard_fail = hard_fail or hit[1]
+        return {'factors': factors, 'hard_fail': hard_fail}
+
+    def enabled(self, name: str) -> bool:
+        return self.config.get(name, {}).get('enabled', True)
+
+    def minimum(self, name: str) -> Optional[float]:
+        return self.config.get(name, {}).get('min') if self.enabled(name) else None
+
+    # Each _compile_* returns signals -> (factor, fails) or None
+    @staticmethod
+    def _compile_alts(rule, fail):
+        return lambda s: (f"Suspicious alts detected ({s['alts']})", fail) if s['alts'] else None
+
+    @staticmethod
+    def _compile_groups(rule, fail):
+        return lambda s: (f"In {s['blacklisted_groups']} blacklisted group(s)", fail) if s['blacklisted_groups'] else None
+
+    @staticmethod
+    def _compile_dhs(rule, fail):
+        def check(s):
+            if s['dhs'] == 'active':
+                return "Found in DHS Database", fail
+            if s['dhs'] == 'removed':
+                return "Previously in DHS Database (removed)", False
+            return None
+        return check
+
+    @staticmethod
+    def _compile_hor(rule, fail):
+        return lambda s: ("Found in HoR Database", fail) if s['hor'] else None
+
+    @staticmethod
+    def _compile_senate(rule, fail):
+        return lambda s: ("Found in Senate Database", fail) if s['senate'] else None
+
+    @staticmethod
+    def _compile_friends(rule, fail):
+        minimum = rule['min']
+        return lambda s: (f"Low friend count ({s['friends']})", fail) \
+            if s['friends'] is not None and s['friends'] < minimum else None
+
+    @staticmethod
+    def _compile_account(rule, fail):
+        minimum = rule['min']
+        return lambda s: (f"Account under {minimum:g} months ({int(s['account_months'])} months old)", fail) \
+            if s['account_months'] is not None and s['account_months'] < minimum else None
+
+    @staticmethod
+    def _compile_cusa(rule, fail):
+        minimum = rule['min']
+        return lambda s: (f"In CUSA less than {minimum:g} months ({int(s['cusa_months'])} months)", fail) \
+            if s['cusa_member'] and s['cusa_months'] is not None and s['cusa_months'] < minimum else None
+
+    @staticmethod
+    def _compile_badges(rule, fail):
+        minimum = rule['min']
+        # A capped count ("N+") never proves the user is under the minimum
+        return lambda s: (f"Few badges ({s['badges']})", fail) \
+            if s.get('badges') is not None and not s.get('badges_more') and s['badges'] < minimum else None
+
+    @staticmethod
+    def _compile_lookalike(rule, fail):
+        return lambda s: (f"Username close to {s['lookalikes']} blacklisted name(s)", fail) \
+            if s.get('lookalikes') else None
+
+
+class GuildRules:
+    """Per-guild overrides of DEFAULT_RULES, persisted as JSON and compiled once per change."""
+
+    def __init__(self, path: str):
+        self.path      = path
+        self.overrides = {}  # str(guild_id) -> {rule: {field: value}}
+        self._compiled = {}
+        self.stamp     = None
+        self.load()
+
+    def load(self):
+        try:
+            self.stamp     = file_stamp(self.path)
+            self.overrides = read_json(self.path)
+        except FileNotFoundError:
+            self.overrides = {}
+        except Exception as e:
+            print(f"[Rules] Error loading {self.path}: {e}")
+            self.overrides = {}
+
+    def save(self):
+        try:
+            tmp = f"{self.path}.tmp"
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(self.overrides, f, indent=2)
+            os.replace(tmp, self.path)
+            self.stamp = file_stamp(self.path)
+        except Exception as e:
+            print(f"[Rules] Error saving {self.path}: {e}")
+
+    def refresh(self):
+        """Re-read the file if another process rewrote it — any --http worker can serve any guild."""
+        if file_stamp(self.path) != self.stamp:
+            self.load()
+            self._compiled = {}
+
+    def config(self, guild_id: Optional[int]) -> Dict:
+        custom = self.overrides.get(str(guild_id), {})
+        return {name: {**rule, **custom.get(name, {})} for name, rule in DEFAULT_RULES.items()}
+
+    def for_guild(self, guild_id: Optional[int]) -> CompiledRules:
+        self.refresh()
+        key = str(guild_id)
+        if key not in self._compiled:
+            self._compiled[key] = CompiledRules(self.config(guild_id))
+        return self._compiled[key]
+
+    def update(self, guild_id: int, rule: str, **changes) -> CompiledRules:
+        with locked_file(self.path):
+            self.refresh()
+            custom = self.overrides.setdefault(str(guild_id), {}).setdefault(rule, {})
+            custom.update({k: v for k, v in changes.items() if v is not None})
+            self._compiled.pop(str(guild_id), None)
+            self.save()
+        return self.for_guild(guild_id)
+
+    def reset(self, guild_id: int) -> CompiledRules:
+        with locked_file(self.path):
+            self.refresh()
+            self.overrides.pop(str(guild_id), None)
+            self._compiled.pop(str(guild_id), None)
+            self.save()
+        return self.for_guild(guild_id)
+
+
+class _Column(list):
+    """Element-wise operators over a plain list — ProfileColumns' stand-in for a NumPy array."""
+
+    def _zip(self, other, op):
+        if isinstance(other, list):
+            return _Column(map(op, self, other))
+        return _Column(op(a, other) for a in self)
+
+    __lt__  = lambda self, other: self._zip(other, operator.lt)
+    __gt__  = lambda self, other: self._zip(other, operator.gt)
+    __ge__  = lambda self, other: self._zip(other, operator.ge)
+    __eq__  = lambda self, other: self._zip(other, operator.eq)
+    __ne__  = lambda self, other: self._zip(other, operator.ne)
+    __and__ = lambda self, other: self._zip(other, operator.and_)
+    __or__  = lambda self, other: self._zip(other, operator.or_)
+    __rsub__ = lambda self, other: self._zip(other, lambda a, b: b - a)
+
+
+class ProfileColumns:
+    """
+    Rule inputs of every evaluated user, one row each, in parallel typed
+    arrays. Re-scoring thousands of watched members after a rule or
+    blacklist change is then a few vectorized passes over the columns
+    instead of a dict-heavy `CompiledRules.apply` per member; factor text
+    is only built for the rows that hit a rule.
+
+    Dates are kept as timestamps and compared at scoring time. Passes run
+    on NumPy when installed, otherwise over plain lists.
+    """
+
+    DHS, DHS_REMOVED, HOR, SENATE, CUSA, BADGES_MORE = 1, 2, 4, 8, 16, 32   # `flags` bits
+    NEED_BITS = {'alts': 1, 'groups': 2, 'names': 4, 'friends': 8, 'cusa': 16, 'badges': 32}
+    COLUMNS   = {
+        'created':     'd',   # account creation, epoch seconds (NaN = unknown)
+        'cusa_joined': 'd',   # CUSA join, epoch seconds (NaN = unknown / not a member)
+        'friends':     'q',   # -1 = not fetched
+        'badges':      'q',   # -1 = not fetched; a lower bound with BADGES_MORE
+        'alts':        'q',
+        'groups':      'q',   # blacklisted groups
+        'lookalikes':  'q',
+        'flags':       'B',
+        'needs':       'B',   # NEED_BITS of the data the row was evaluated from
+        'generation':  'q',   # blacklist generation `flags`, `groups` and `lookalikes` are valid for
+    }
+
+    def __init__(self, max_size: int = PROFILE_COLUMNS_SIZE):
+        self.max_size = max_size
+        self.rows     = {}   # user ID -> row
+        self.inputs   = []   # row -> (username, past names, group IDs), to re-flag after a reload
+        self.cols     = {name: array(code) for name, code in self.COLUMNS.items()}
+        self._lock    = threading.Lock()
+
+    @classmethod
+    def listing_flags(cls, dhs_entry: Optional[Dict], hor_entry: Optional[Dict], senate_entry: Optional[Dict]) -> int:
+        flags = 0
+        if dhs_entry:
+            flags |= cls.DHS_REMOVED if dhs_entry.get('removed') else cls.DHS
+        if hor_entry is not None:
+            flags |= cls.HOR
+        if senate_entry is not None:
+            flags |= cls.SENATE
+        return flags
+
+    def update(self, profile: Dict):
+        """Store a profile's rule inputs, unless its row holds data this profile wasn't evaluated from."""
+        s      = profile['signals']
+        needs  = sum(self.NEED_BITS[n] for n in profile['needs'])
+        values = {
+            'created':     profile.get('created_at') or math.nan,
+            'cusa_joined': profile.get('cusa_joined_at') or math.nan,
+            'friends':     -1 if s['friends'] is None else s['friends'],
+            'badges':      -1 if s.get('badges') is None else s['badges'],
+            'alts':        s['alts'],
+            'groups':      s['blacklisted_groups'],
+            'lookalikes':  s.get('lookalikes', 0),
+            'flags':       self.listing_flags(profile['dhs_entry'], profile['hor_entry'], profile['senate_entry'])
+                           | (self.CUSA if s['cusa_member'] else 0)
+                           | (self.BADGES_MORE if s.get('badges_more') else 0),
+            'needs':       needs,
+            'generation':  profile['generation'],
+        }
+        inputs = (profile['username'], tuple(profile.get('past_names') or ()),
+                  tuple(str(g['id']) for g in profile['user_groups'] or []))
+        with self._lock:
+            row = self.rows.get(profile['user_id'])
+            if row is None:
+                if len(self.inputs) >= self.max_size:
+                    return
+                self.rows[profile['user_id']] = len(self.inputs)
+                self.inputs.append(inputs)
+                for name, value in values.items():
+                    self.cols[name].append(value)
+            elif not self.cols['needs'][row] & ~needs:
+                self.inputs[row] = inputs
+                for name, value in values.items():
+                    self.cols[name][row] = value
+
+    def rebase(self, changes: Dict, generation: int, relist):
+        """
+        Carry rows evaluated under the previous blacklist generation over to
+        `generation`. Rows the reload `changes` touch — including usernames a
+        few edits from a changed listing, whose lookalike count may differ —
+        get their listings redone by
+        `relist(user_id, inputs) -> (flags, groups, lookalikes)`.
+        """
+        near = None
+        if changes['usernames']:
+            near = FuzzyNameIndex()
+            near.build([('changed', {n: {'username': n, 'user_id': ''} for n in changes['usernames']})])
+        with self._lock:
+            flags, gen = self.cols['flags'], self.cols['generation']
+            for user_id, row in self.rows.items():
+                if gen[row] != generation - 1:
+                    continue
+                username, past_names, group_ids = self.inputs[row]
+                names = {username.lower(), *(n.lower() for n in past_names)}
+                if (str(user_id) in changes['user_ids'] or not names.isdisjoint(changes['usernames'])
+                        or not changes['group_ids'].isdisjoint(group_ids)
+                        or (near is not None and near.search(username, limit=1))):
+                    listed, groups, lookalikes = relist(user_id, self.inputs[row])
+                    flags[row] = listed | (flags[row] & (self.CUSA | self.BADGES_MORE))
+                    self.cols['groups'][row]     = groups
+                    self.cols['lookalikes'][row] = lookalikes
+                gen[row] = generation
+
+    def _take(self, name: str, index):
+        if numpy is not None:
+            return numpy.frombuffer(self.cols[name], dtype=self.COLUMNS[name])[index]
+        col = self.cols[name]
+        return _Column(col[i] for i in index)
+
+    @staticmethod
+    def _months_under(elapsed, minimum: float):
+        # months = whole days / 30.44, as get_account_age_months counts them
+        return elapsed < math.ceil(minimum * 30.44) * 86400
+
+    def _rule_masks(self, config: Dict, c: Dict, now: float) -> List[tuple]:
+        """(hit, fails) row masks for every enabled rule; fails is None for factor-only rules."""
+        hits = {
+            'alts':      lambda r: c['alts'] > 0,
+            'groups':    lambda r: c['groups'] > 0,
+            'dhs':       lambda r: (c['flags'] & (self.DHS | self.DHS_REMOVED)) != 0,
+            'hor':       lambda r: (c['flags'] & self.HOR) != 0,
+            'senate':    lambda r: (c['flags'] & self.SENATE) != 0,
+            'friends':   lambda r: (c['friends'] >= 0) & (c['friends'] < r['min']),
+            'account':   lambda r: self._months_under(now - c['created'], r['min']),
+            'cusa':      lambda r: ((c['flags'] & self.CUSA) != 0) & self._months_under(now - c['cusa_joined'], r['min']),
+            'lookalike': lambda r: c['lookalikes'] > 0,
+            'badges':    lambda r: (c['badges'] >= 0) & (c['badges'] < r['min']) & ((c['flags'] & self.BADGES_MORE) == 0),
+        }
+        masks = []
+        for name, rule in config.items():
+            if not rule.get('enabled', True):
+                continue
+            hit   = hits[name](rule)
+            fails = None
+            if rule.get('fail'):
+                # A removed DHS listing is only ever a factor
+                fails = (c['flags'] & self.DHS) != 0 if name == 'dhs' else hit
+            masks.append((hit, fails))
+        return masks
+
+    def signals(self, row: int, now: float) -> Dict:
+        """A row as the `signals` dict CompiledRules checks."""
+        c     = {name: col[row] for name, col in self.cols.items()}
+        flags = c['flags']
+
+        def months(ts):
+            return None if math.isnan(ts) else ((now - ts) // 86400) / 30.44
+
+        return {
+            'alts':               c['alts'],
+            'blacklisted_groups': c['groups'],
+            'dhs':                'active' if flags & self.DHS else 'removed' if flags & self.DHS_REMOVED else None,
+            'hor':                bool(flags & self.HOR),
+            'senate':             bool(flags & self.SENATE),
+            'friends':            None if c['friends'] < 0 else c['friends'],
+            'account_months':     months(c['created']),
+            'cusa_member':        bool(flags & self.CUSA),
+            'cusa_months':        months(c['cusa_joined']),
+            'lookalikes':         c['lookalikes'],
+            'badges':             None if c['badges'] < 0 else c['badges'],
+            'badges_more':        bool(flags & self.BADGES_MORE),
+        }
+
+    def score(self, rules: CompiledRules, user_ids, generation: int) -> tuple:
+        """
+        Verdicts for `user_ids` under `rules`: ([(user_id, hard_fail, factors)], missing).
+        Users are missing without a row evaluated from everything the rules
+        can fail on, under the current blacklist `generation`.
+        """
+        wanted = sum(self.NEED_BITS[n] for n in rules.verdict_needs)
+        now    = time.time()
+        with self._lock:
+            rows    = [self.rows.get(user_id) for user_id in user_ids]
+            missing = [user_id for user_id, row in zip(user_ids, rows) if row is None]
+            found   = [(user_id, row) for user_id, row in zip(user_ids, rows) if row is not None]
+            if not found:
+                return [], missing
+            index = [row for _, row in found]
+            index = numpy.array(index) if numpy is not None else index
+            c     = {name: self._take(name, index) for name in self.COLUMNS}
+
+            usable  = ((c['needs'] & wanted) == wanted) & (c['generation'] == generation)
+            any_hit = hard_fail = usable != usable   # all False
+            for hit, fails in self._rule_masks(rules.config, c, now):
+                any_hit = any_hit | hit
+                if fails is not None:
+                    hard_fail = hard_fail | fails
+            columns = [list(mask) if numpy is None else mask.tolist() for mask in (usable, any_hit, hard_fail)]
+
+            # Factor text only for the rows that hit something
+            verdicts = []
+            for (user_id, row), ok, hit, failed in zip(found, *columns):
+                if not ok:
+                    missing.append(user_id)
+                else:
+                    factors = rules.apply({'signals': self.signals(row, now)})['factors'] if hit else []
+                    verdicts.append((user_id, failed, factors))
+        return verdicts, missing
+
+
+class GroupCatalog:
+    """
+    Shared group metadata keyed by integer group ID: name, member count,
+    role names and blacklist status. Per-user group lists only store
+    (group ID, role ID) pairs and are expanded against this catalog.
+    """
+
+    BULK_SIZE = 100  # group IDs per bulk lookup
+
     def __init__(self):
-        self.blacklisted_groups = []
+        self.groups = {}  # gid -> {'name', 'member_count', 'roles': {role_id: name}, 'blacklisted'}
+        # Worker threads add groups during checks while reloads iterate them
+        self._lock  = threading.Lock()
+
+    def _group(self, gid: int) -> Dict:
+        group = self.groups.get(gid)
+        if group is None:
+            with self._lock:
+                group = self.groups.setdefault(gid, {
+                    'name': None, 'member_count': None, 'roles': {}, 'blacklisted': False,
+                    'doc_name': None, 'section': None,
+                })
+        return group
+
+    def items(self) -> List[tuple]:
+        with self._lock:
+            return list(self.groups.items())
+
+    def learn(self, membership: Dict) -> List[int]:
+        """Record one entry of a user-groups response; returns its compact [gid, role_id] pair."""
+        info, role = membership['group'], membership['role']
+        group = self._group(int(info['id']))
+        group['name'] = info.get('name') or group['name']
+        if info.get('memberCount') is not None:
+            group['member_count'] = info['memberCount']
+        group['roles'][role['id']] = role.get('name', '')
+        return [int(info['id']), role['id']]
+
+    def name(self, gid) -> str:
+        group = self.groups.get(int(gid))
+        if not group:
+            return str(gid)
+        return group['name'] or group['doc_name'] or str(gid)
+
+    def section(self, gid) -> Optional[str]:
+        group = self.groups.get(int(gid))
+        return group['section'] if group else None
+
+    def note_doc_records(self, records: Dict):
+        """Attach the blacklist doc's name and section to each listed group."""
+        for gid, record in records.items():
+            group = self._group(gid)
+            group['doc_name'] = record['name']
+            group['section']  = record['section']
+
+    def expand(self, pairs) -> List[Dict]:
+        """Turn compact pairs back into the {'id', 'name', 'role'} dicts the checks use."""
+        result = []
+        for gid, role_id in pairs:
+            group = self.groups.get(gid, {})
+            result.append({
+                'id':   str(gid),
+                'name': group.get('name') or str(gid),
+                'role': group.get('roles', {}).get(role_id, ''),
+            })
+        return result
+
+    def set_blacklisted(self, group_ids):
+        blacklisted = {int(g) for g in group_ids if str(g).isdigit()}
+        for gid, group in self.items():
+            group['blacklisted'] = gid in blacklisted
+        for gid in blacklisted:
+            self._group(gid)['blacklisted'] = True
+
+    def fill(self, group_ids, get) -> int:
+        """Bulk-fetch names for groups not yet named, BULK_SIZE IDs per request."""
+        missing = sorted({int(g) for g in group_ids if str(g).isdigit()} -
+                         {gid for gid, group in self.items() if group['name']})
+        named = 0
+        for i in range(0, len(missing), self.BULK_SIZE):
+            chunk = missing[i:i + self.BULK_SIZE]
+            try:
+                r = get(ROBLOX_GROUPS_BULK_API.format(",".join(map(str, chunk))), timeout=10)
+                if r.status_code != 200:
+                    print(f"[Catalog] Bulk lookup failed: HTTP {r.status_code}")
+                    continue
+                for info in r.json().get('data', []):
+                    self._group(int(info['id']))['name'] = info.get('name')
+                    named += 1
+            except Exception as e:
+                print(f"[Catalog] Bulk lookup error: {e}")
+        return named
+
+
+class NameIndex:
+    """
+    Sorted (lowercased name, user ID) keys for prefix search — backs slash
+    command autocomplete with no Roblox requests.
+
+    Blacklist entries are replaced on every reload; usernames and display
+    names seen in Roblox responses accumulate up to `max_size`.
+    """
+
+    BLACKLIST_TAGS = ('dhs', 'hor', 'senate')
+
+    def __init__(self, max_size: int = NAME_INDEX_SIZE):
+        self.max_size = max_size
+        self.keys     = []   # sorted (lowercased name, user id)
+        self.entries  = {}   # key -> (label, tag)
+        self._lock    = threading.Lock()
+
+    def add(self, name: str, user_id, tag: str = 'seen', label: Optional[str] = None):
+        if not name or not str(user_id).isdigit():
+            return
+        key = (name.lower(), int(user_id))
+        with self._lock:
+            if key in self.entries or len(self.entries) >= self.max_size:
+                return
+            self.entries[key] = (label or name, tag)
+            insort(self.keys, key)
+
+    def set_blacklists(self, sources):
+        """Replace the blacklist entries; `sources` is [(tag, entries by user ID)]."""
+        with self._lock:
+            entries = {k: v for k, v in self.entries.items() if v[1] not in self.BLACKLIST_TAGS}
+            for tag, by_id in sources:
+                for entry in by_id.values():
+                    name, uid = entry.get('username'), entry.get('user_id')
+                    if name and str(uid).isdigit():
+                        entries[(name.lower(), int(uid))] = (name, tag)
+            self.entries = entries
+            self.keys    = sorted(entries)
+
+    def search(self, prefix: str, limit: int = 25) -> List[tuple]:
+        """Up to `limit` (label, user_id, tag) whose name starts with `prefix`, one per user."""
+        prefix = prefix.strip().lstrip('@').lower()
+        if not prefix:
+            return []
+        found, seen = [], set()
+        with self._lock:
+            i = bisect_left(self.keys, (prefix,))
+            while i < len(self.keys) and len(found) < limit:
+                key = self.keys[i]
+                if not key[0].startswith(prefix):
+                    break
+                if key[1] not in seen:
+                    seen.add(key[1])
+                    label, tag = self.entries[key]
+                    found.append((label, key[1], tag))
+                i += 1
+        return found
+
+
+def osa_distance(a: str, b: str, limit: int) -> int:
+    """
+    Optimal string alignment distance between `a` and `b` (edits plus
+    adjacent swaps), or `limit + 1` as soon as it is known to exceed `limit`.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    prev2, prev = None, list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        row = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost   = a[i - 1] != b[j - 1]
+            row[j] = min(prev[j] + 1, row[j - 1] + 1, prev[j - 1] + cost)
+            if cost and i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                row[j] = min(row[j], prev2[j - 2] + 1)
+        if min(row) > limit:
+            return limit + 1
+        prev2, prev = prev, row
+    return prev[-1]
+
+
+class FuzzyNameIndex:
+    """
+    SymSpell-style index of blacklisted usernames for lookalike matching.
+
+    Each name is filed under every string reachable by deleting up to
+    FUZZY_MAX_DISTANCE characters from its first FUZZY_PREFIX_LENGTH
+    characters. A lookup generates the same deletes for the query, so only
+    names sharing one are compared — a few dozen dict probes regardless of
+    how many names are indexed.
+    """
+
+    def __init__(self, max_distance: int = FUZZY_MAX_DISTANCE, prefix: int = FUZZY_PREFIX_LENGTH):
+        self.max_distance = max_distance
+        self.prefix       = prefix
+        # (names, deletes) swapped in whole on rebuild: names is [(lowercased, label, user id, tag)],
+        # deletes maps a delete string to indexes into names
+        self._state = ([], {})
+
+    def _deletes(self, word: str) -> set:
+        word   = word[:self.prefix]
+        found  = {word}
+        layer  = {word}
+        for _ in range(self.max_distance):
+            layer = {w[:i] + w[i + 1:] for w in layer for i in range(len(w))}
+            found |= layer
+        return found
+
+    def _limit(self, length: int) -> int:
+        if length < FUZZY_MIN_LENGTH:
+            return 0
+        return self.max_distance if length >= FUZZY_FULL_LENGTH else min(1, self.max_distance)
+
+    def build(self, sources):
+        """Rebuild from `sources`, [(tag, entries by user ID)] as for NameIndex.set_blacklists."""
+        names, deletes = [], {}
+        for tag, by_id in sources:
+            for entry in by_id.values():
+                name, uid = entry.get('username'), entry.get('user_id')
+                if not name or len(name) < FUZZY_MIN_LENGTH:
+                    continue
+                for key in self._deletes(name.lower()):
+                    deletes.setdefault(key, []).append(len(names))
+                names.append((name.lower(), name, str(uid), tag))
+        self._state = (names, deletes)
+
+    def search(self, name: str, limit: int = 5) -> List[tuple]:
+        """Up to `limit` (label, user_id, tag, distance) within the edit limit of `name`, closest first. Exact matches are left out."""
+        query    = name.strip().lstrip('@').lower()
+        distance = self._limit(len(query))
+        if not distance:
+            return []
+        names, deletes = self._state
+        found, seen    = [], set()
+        for key in self._deletes(query):
+            for i in deletes.get(key, ()):
+                if i in seen:
+                    continue
+                seen.add(i)
+                lowered, label, uid, tag = names[i]
+                allowed = min(distance, self._limit(len(lowered)))
+                d       = osa_distance(query, lowered, allowed)
+                if 0 < d <= allowed:
+                    found.append((d, label, uid, tag))
+        found.sort()
+        return [(label, uid, tag, d) for d, label, uid, tag in found[:limit]]
+
+
+class RobloxChecker:
+    def __init__(self, graph_path: Optional[str] = GRAPH_PATH):
+        # Doc group blacklist — set of group IDs (str), plus per-ID doc details
+        self.blacklisted_groups = set()
+        self.blacklist_records  = {}  # int gid -> {'group_id', 'name', 'section'}
+
+        # Bumped whenever a reload actually changes blacklist contents
+        self.blacklist_generation = 0
+        # Hash of the contents; unlike the generation it means the same thing after a restart
+        self.blacklist_digest     = None
+
+        # Roblox API responses, keyed by (kind, user_id); expired ones back up failed refetches
+        self.cache = TTLCache(ROBLOX_CACHE_TTL, stale_ttl=ROBLOX_STALE_TTL)
+
+        # ('username' | 'display', lowercased name) -> {'id', 'name', 'displayName'}
+        self.name_ids = TTLCache(NAME_CACHE_TTL, max_size=NAME_CACHE_SIZE)
+
+        # Every name known locally, for autocomplete
+        self.name_index = NameIndex()
+
+        # Blacklisted usernames, for lookalike matching
+        self.fuzzy_index = FuzzyNameIndex()
+
+        # Set by use_sidecar() — shared cache, rate limit and blacklist snapshot
+        self.sidecar = None
+
+        # Orders this process's Roblox requests by priority and deadline
+        self.scheduler = LookupScheduler(LOOKUP_SLOTS)
+
+        # Per-host circuit breakers, and cache keys being refreshed after serving stale data
+        self.breakers          = {}
+        self._revalidating     = set()
+        self._revalidate_lock  = threading.Lock()
+        self._revalidate_pool  = ThreadPoolExecutor(max_workers=2, thread_name_prefix="revalidate")
+
+        # Username histories and badges are fetched here, alongside a check's other lookups
+        self._side_pool = ThreadPoolExecutor(max_workers=ROBLOX_WORKERS, thread_name_prefix="side-lookup")
+
+        # Risk profiles per user ID, reused while their inputs are unchanged
+        self.profiles = TTLCache(ROBLOX_CACHE_TTL)
+
+        # The same profiles' rule inputs, column-wise and kept past expiry, for bulk re-scoring
+        self.columns = ProfileColumns()
+
+        # Friend / group edges recorded from every fetch
+        self.graph = RelationshipGraph(graph_path)
+        for uid, name in self.graph.names.items():
+            self.name_index.add(name, uid)
+
+        # Group names, member counts and roles shared by every user's group list
+        self.catalog = GroupCatalog()
 
         # DHS database — keyed by user_id (str) and lowercased username
         self.dhs_by_id       = {}
@@ -82,16 +1878,78 @@ class RobloxChecker:
         self.senate_by_id       = {}
         self.senate_by_username = {}
 
+    def use_sidecar(self, address: str):
+        """Share the Roblox cache, rate limit and blacklists with other worker processes."""
+        self.sidecar = SidecarClient(address)
+        self.cache   = SidecarCache(self.sidecar)
+        print(f"[Sidecar] Using shared cache and rate limit at {address}")
+
+    # ── Roblox HTTP ────────────────────────────────────────────────────────────
+    def _request(self, method: str, url: str, **kwargs):
+        host    = urlsplit(url).netloc
+        breaker = self.breakers.get(host) or self.breakers.setdefault(host, CircuitBreaker(host))
+        kwargs.setdefault('timeout', ROBLOX_TIMEOUT)
+        with self.scheduler.slot():
+            if not breaker.allow():
+                raise EndpointUnavailable(f"{host} is failing, request skipped")
+            if self.sidecar:
+                self.sidecar.acquire()
+            try:
+                r = requests.request(method, url, **kwargs)
+            except Exception:
+                breaker.record(False)
+                raise
+        breaker.record(r.status_code < 500 and r.status_code != 429)
+        return r
+
+    def _get(self, url: str, **kwargs):
+        return self._request('GET', url, **kwargs)
+
+    def _post(self, url: str, **kwargs):
+        return self._request('POST', url, **kwargs)
+
+    def _fallback(self, key: tuple, refresh):
+        """
+        After a failed fetch, serve the expired cache entry for `key` (if any)
+        and call `refresh` in the background to replace it. One refresh per
+        key at a time; it runs at background priority.
+        """
+        item = self.cache.get_stale(key)
+        if item is None:
+            return None
+
+        with self._revalidate_lock:
+            if key in self._revalidating:
+                return item[0]
+            self._revalidating.add(key)
+
+        def revalidate():
+            try:
+                refresh()
+            finally:
+                with self._revalidate_lock:
+                    self._revalidating.discard(key)
+
+        self._revalidate_pool.submit(revalidate)
+        return item[0]
+
     # ── Group doc blacklist ────────────────────────────────────────────────────
     async def fetch_blacklist(self):
         try:
-            r = requests.get(BLACKLIST_DOC_URL, timeout=10)
-            if r.status_code == 200:
-                group_ids = re.findall(r'\b(\d{6,})\b', r.text)
-                self.blacklisted_groups = list(set(group_ids))
-                print(f"[Groups] Loaded {len(self.blacklisted_groups)} blacklisted groups")
-                return True
-            return False
+            with requests.get(BLACKLIST_DOC_URL, timeout=10, stream=True) as r:
+                if r.status_code != 200:
+                    return False
+                records = {}
+                for record in iter_doc_groups(r.iter_content(DOC_CHUNK_SIZE)):
+                    # First mention wins; later ones only fill in a missing name
+                    known = records.setdefault(record['group_id'], record)
+                    if not known['name']:
+                        known['name'] = record['name']
+
+            self.blacklist_records  = records
+            self.blacklisted_groups = {str(gid) for gid in records}
+            print(f"[Groups] Loaded {len(self.blacklisted_groups)} blacklisted groups")
+            return True
         except Exception as e:
             print(f"[Groups] Error: {e}")
             return False
@@ -109,9 +1967,6 @@ class RobloxChecker:
         Detected via Google Sheets API v4 if GOOGLE_API_KEY is set,
         otherwise falls back to CSV (all entries treated as active).
         """
-        self.dhs_by_id       = {}
-        self.dhs_by_username = {}
-
         if GOOGLE_API_KEY:
             return await self._fetch_dhs_with_formatting()
         else:
@@ -131,6 +1986,7 @@ class RobloxChecker:
                 return await self._fetch_dhs_csv()
 
             rows = r.json().get('sheets', [{}])[0].get('data', [{}])[0].get('rowData', [])
+            by_id, by_username = {}, {}
 
             # Skip header row (index 0)
             for row_data in rows[1:]:
@@ -166,10 +2022,12 @@ class RobloxChecker:
                     'removed':    removed,
                 }
 
-                self.dhs_by_id[uid] = entry
+                by_id[uid] = entry
                 if name:
-                    self.dhs_by_username[name.lower()] = entry
+                    by_username[name.lower()] = entry
 
+            # Swapped in whole so checks never see a half-loaded sheet
+            self.dhs_by_id, self.dhs_by_username = by_id, by_username
             active  = sum(1 for e in self.dhs_by_id.values() if not e['removed'])
             removed = sum(1 for e in self.dhs_by_id.values() if e['removed'])
             print(f"[DHS] Loaded {len(self.dhs_by_id)} entries ({active} active, {removed} removed)")
@@ -187,6 +2045,7 @@ class RobloxChecker:
                 print(f"[DHS] CSV fetch failed: HTTP {r.status_code}")
                 return False
 
+            by_id, by_username = {}, {}
             reader = csv.reader(io.StringIO(r.text))
             for row in list(reader)[1:]:
                 while len(row) < 11:
@@ -209,10 +2068,11 @@ class RobloxChecker:
                     'removed':    False,  # unknown without API key
                 }
 
-                self.dhs_by_id[uid] = entry
+                by_id[uid] = entry
                 if name:
-                    self.dhs_by_username[name.lower()] = entry
+                    by_username[name.lower()] = entry
 
+            self.dhs_by_id, self.dhs_by_username = by_id, by_username
             print(f"[DHS] Loaded {len(self.dhs_by_id)} entries (strikethrough detection disabled — no API key)")
             return True
         except Exception as e:
@@ -242,8 +2102,7 @@ class RobloxChecker:
                 print(f"[HoR] Fetch failed: HTTP {r.status_code}")
                 return False
 
-            self.hor_by_id       = {}
-            self.hor_by_username = {}
+            by_id, by_username = {}, {}
 
             reader = csv.reader(io.StringIO(r.text))
             rows   = list(reader)
@@ -271,10 +2130,11 @@ class RobloxChecker:
                     'reason':     reason     or 'Not specified',
                 }
 
-                self.hor_by_id[uid] = entry
+                by_id[uid] = entry
                 if name:
-                    self.hor_by_username[name.lower()] = entry
+                    by_username[name.lower()] = entry
 
+            self.hor_by_id, self.hor_by_username = by_id, by_username
             print(f"[HoR] Loaded {len(self.hor_by_id)} entries")
             return True
         except Exception as e:
@@ -304,8 +2164,7 @@ class RobloxChecker:
                 print(f"[Senate] Fetch failed: HTTP {r.status_code}")
                 return False
 
-            self.senate_by_id       = {}
-            self.senate_by_username = {}
+            by_id, by_username = {}, {}
 
             reader = csv.reader(io.StringIO(r.text))
             rows   = list(reader)
@@ -332,16 +2191,114 @@ class RobloxChecker:
                     'reason':     reason     or 'Not specified',
                 }
 
-                self.senate_by_id[uid] = entry
+                by_id[uid] = entry
                 if name:
-                    self.senate_by_username[name.lower()] = entry
+                    by_username[name.lower()] = entry
 
+            self.senate_by_id, self.senate_by_username = by_id, by_username
             print(f"[Senate] Loaded {len(self.senate_by_id)} entries")
             return True
         except Exception as e:
             print(f"[Senate] Error: {e}")
             return False
 
+    # ── Reload all sources ─────────────────────────────────────────────────────
+    def _blacklist_state(self):
+        """Snapshot of blacklist contents used to work out what a reload changed."""
+        ids, names = set(), set()
+        for tag, by_id, by_name in (
+            ('dhs',    self.dhs_by_id,    self.dhs_by_username),
+            ('hor',    self.hor_by_id,    self.hor_by_username),
+            ('senate', self.senate_by_id, self.senate_by_username),
+        ):
+            ids.update((tag, uid, bool(e.get('removed'))) for uid, e in by_id.items())
+            names.update((tag, n, bool(e.get('removed'))) for n, e in by_name.items())
+        return ids, names, set(self.blacklisted_groups)
+
+    def write_snapshot(self, path: str):
+        """Atomically write the loaded blacklists for worker processes to share."""
+        BlacklistSnapshot.write(path, self.blacklist_generation, self.blacklisted_groups, [
+            (SOURCE_DHS,    self.dhs_by_id,    self.dhs_by_username),
+            (SOURCE_HOR,    self.hor_by_id,    self.hor_by_username),
+            (SOURCE_SENATE, self.senate_by_id, self.senate_by_username),
+        ])
+
+    def mapped_sources(self) -> List[str]:
+        """Sources still served from a memory-mapped snapshot rather than a fresh fetch."""
+        sources = {'groups': self.blacklisted_groups, 'dhs': self.dhs_by_id,
+                   'hor': self.hor_by_id, 'senate': self.senate_by_id}
+        return [tag for tag, src in sources.items() if isinstance(src, (SnapshotSource, SnapshotGroups))]
+
+    def load_snapshot(self, path: str) -> Dict[str, bool]:
+        """Point the blacklist lookups at a memory-mapped snapshot written by the sidecar."""
+        try:
+            snap = BlacklistSnapshot(path)
+        except Exception as e:
+            print(f"[Snapshot] Error loading {path}: {e}")
+            return {'groups': False, 'dhs': False, 'hor': False, 'senate': False}
+
+        self.blacklisted_groups = SnapshotGroups(snap)
+        for tag, bit in (('dhs', SOURCE_DHS), ('hor', SOURCE_HOR), ('senate', SOURCE_SENATE)):
+            setattr(self, f"{tag}_by_id",       SnapshotSource(snap, bit))
+            setattr(self, f"{tag}_by_username", SnapshotSource(snap, bit, by_username=True))
+
+        print(f"[Snapshot] Mapped generation {snap.generation} from {path}")
+        self._index_blacklists()
+        return {'groups': True, 'dhs': True, 'hor': True, 'senate': True}
+
+    def _index_blacklists(self):
+        sources = [('dhs', self.dhs_by_id), ('hor', self.hor_by_id), ('senate', self.senate_by_id)]
+        self.name_index.set_blacklists(sources)
+        self.fuzzy_index.build(sources)
+        ids, names, groups = self._blacklist_state()
+        self.blacklist_digest = hashlib.sha1(
+            repr((sorted(ids), sorted(names), sorted(map(str, groups)))).encode()
+        ).hexdigest()
+
+    async def reload_all(self):
+        """
+        Reload every blacklist source — or, behind a sidecar, its snapshot.
+
+        Returns (results, changes) where results maps source → success and
+        changes holds the user IDs, lowercased usernames and group IDs whose
+        blacklist status differs from before the reload.
+        """
+        old_ids, old_names, old_groups = self._blacklist_state()
+
+        loop = asyncio.get_running_loop()
+        if self.sidecar:
+            results = await loop.run_in_executor(None, self.load_snapshot, BLACKLIST_SNAPSHOT_PATH)
+        else:
+            # The fetchers block on HTTP — run all four side by side off the event loop
+            fetchers = {
+                'groups': self.fetch_blacklist,
+                'dhs':    self.fetch_dhs,
+                'hor':    self.fetch_hor,
+                'senate': self.fetch_senate,
+            }
+            done    = await asyncio.gather(*(loop.run_in_executor(None, asyncio.run, f()) for f in fetchers.values()))
+            results = dict(zip(fetchers, done))
+            # Building the lookalike index is CPU-bound, keep it off the loop too
+            await loop.run_in_executor(None, self._index_blacklists)
+
+        # Name every blacklisted group up front so results can show them
+        self.catalog.note_doc_records(self.blacklist_records)
+        await loop.run_in_executor(None, self.catalog.fill, self.blacklisted_groups, self._get)
+        self.catalog.set_blacklisted(self.blacklisted_groups)
+
+        new_ids, new_names, new_groups = self._blacklist_state()
+        changes = {
+            'user_ids':  {uid for _, uid, _ in old_ids ^ new_ids},
+            'usernames': {n for _, n, _ in old_names ^ new_names},
+            'group_ids': old_groups ^ new_groups,
+        }
+        if any(changes.values()):
+            self.blacklist_generation += 1
+            print(f"[Blacklist] Generation {self.blacklist_generation}: "
+                  f"{len(changes['user_ids'])} user(s), {len(changes['group_ids'])} group(s) changed")
+            await loop.run_in_executor(None, self.columns.rebase, changes, self.blacklist_generation, self._relist)
+        return results, changes
+
     # ── Lookup helpers ─────────────────────────────────────────────────────────
     def check_dhs(self, username: str, user_id: int) -> Optional[Dict]:
         return (
@@ -361,6 +2318,49 @@ class RobloxChecker:
             self.senate_by_username.get(username.lower())
         )
 
+    def local_hits(self, username: str, user_id: int) -> List[str]:
+        """Active DHS / HoR / Senate listings for a user — local lookups only."""
+        hits = []
+        dhs = self.check_dhs(username, user_id)
+        if dhs and not dhs.get('removed'):
+            hits.append("DHS")
+        if self.check_hor(username, user_id):
+            hits.append("HoR")
+        if self.check_senate(username, user_id):
+            hits.append("Senate")
+        return hits
+
+    def listings(self, username: str, user_id: int, past_names) -> tuple:
+        """(DHS, HoR, Senate) entries for a user, by ID, current username or any past username."""
+        past = self.past_name_hits(past_names)
+        return (
+            self.check_dhs(username, user_id) or past.get('dhs'),
+            self.check_hor(username, user_id) or past.get('hor'),
+            self.check_senate(username, user_id) or past.get('senate'),
+        )
+
+    def _relist(self, user_id: int, inputs: tuple) -> tuple:
+        """Blacklist-dependent ProfileColumns values for a row's stored inputs."""
+        username, past_names, group_ids = inputs
+        return (ProfileColumns.listing_flags(*self.listings(username, user_id, past_names)),
+                sum(1 for gid in group_ids if gid in self.blacklisted_groups),
+                len(self.lookalikes(username, user_id)))
+
+    def past_name_hits(self, names) -> Dict[str, Dict]:
+        """First DHS / HoR / Senate entry listed under any of `names`, by source — local lookups only."""
+        lowered = {name.lower() for name in names}
+        hits    = {}
+        for tag in ('dhs', 'hor', 'senate'):
+            by_username = getattr(self, f"{tag}_by_username")
+            entry = next(filter(None, map(by_username.get, lowered)), None)
+            if entry is not None:
+                hits[tag] = entry
+        return hits
+
+    def lookalikes(self, username: str, user_id: int) -> List[tuple]:
+        """Blacklisted usernames a few edits from `username`, other than the user's own listings."""
+        return [m for m in self.fuzzy_index.search(username) if m[1] != str(user_id)]
+
     def format_entry(self, entry: Dict) -> str:
         """Format a database entry for display in the embed."""
         lines = []
@@ -374,16 +2374,53 @@ class RobloxChecker:
 
     # ── Roblox API methods ─────────────────────────────────────────────────────
     def get_user_info(self, user_id: int) -> Optional[Dict]:
+        cached = self.cache.get(('user', user_id))
+        if cached is not None:
+            return cached
         try:
-            r = requests.get(ROBLOX_USER_API.format(user_id))
-            return r.json() if r.status_code == 200 else None
+            r = self._get(ROBLOX_USER_API.format(user_id))
+            if r.status_code == 200:
+                info = r.json()
+                self.cache.set(('user', user_id), info)
+                self._learn_name(info)
+                return info
         except Exception as e:
             print(f"Error fetching user info: {e}")
-            return None
+        return self._fallback(('user', user_id), lambda: self.get_user_info(user_id))
+
+    def _learn_name(self, user: Dict) -> Dict:
+        """Remember the username → user mapping from any Roblox response; returns the stored identity."""
+        identity = {
+            'id':          user.get('id'),
+            'name':        user.get('name', ''),
+            'displayName': user.get('displayName') or user.get('name', ''),
+        }
+        if identity['id'] and identity['name']:
+            self.name_ids.set(('username', identity['name'].lower()), identity)
+            self.name_index.add(identity['name'], identity['id'])
+            if identity['displayName'].lower() != identity['name'].lower():
+                self.name_index.add(identity['displayName'], identity['id'], 'display',
+                                    label=f"{identity['displayName']} (@{identity['name']})")
+        return identity
+
+    def _resolved(self, user: Dict, full: bool) -> Optional[Dict]:
+        """The cached profile for a resolved user, else `user` itself unless `full` needs the profile."""
+        cached = self.cache.get(('user', user['id']))
+        if cached is not None or not full:
+            return cached or user
+        return self.get_user_info(user['id'])
+
+    def resolve_user(self, query: str, full: bool = True) -> Optional[Dict]:
+        """
+        Resolve a query (numeric ID, @username, or display name) to a user info dict.
 
-    def resolve_user(self, query: str) -> Optional[Dict]:
-        """Resolve a query (numeric ID, @username, or display name) to a user info dict."""
+        Names resolved before come from `name_ids` without a request. Otherwise
+        the username lookup / display-name search response is used as-is —
+        `id`, `name` and `displayName` only. `full=True` also makes sure the
+        profile (with `created`) is loaded, fetching it if it isn't cached.
+        """
         query = query.strip().lstrip('@')
+        key   = query.lower()
 
         # ── Try numeric ID first ───────────────────────────────────────────────
         if query.isdigit():
@@ -391,9 +2428,14 @@ class RobloxChecker:
             if info and not info.get('errors'):
                 return info
 
+        # ── Names resolved before ──────────────────────────────────────────────
+        user = self.name_ids.get(('username', key)) or self.name_ids.get(('display', key))
+        if user:
+            return self._resolved(user, full)
+
         # ── Try exact username match (POST endpoint) ───────────────────────────
         try:
-            r = requests.post(
+            r = self._post(
                 "https://users.roblox.com/v1/usernames/users",
                 json={"usernames": [query], "excludeBannedUsers": False},
                 timeout=10
@@ -401,45 +2443,133 @@ class RobloxChecker:
             if r.status_code == 200:
                 data = r.json().get('data', [])
                 if data:
-                    return self.get_user_info(data[0]['id'])
+                    return self._resolved(self._learn_name(data[0]), full)
         except Exception as e:
             print(f"Error resolving by username: {e}")
 
         # ── Fall back to keyword search (catches display names) ────────────────
         try:
-            r = requests.get(ROBLOX_USERNAME_SEARCH.format(requests.utils.quote(query)), timeout=10)
+            r = self._get(ROBLOX_USERNAME_SEARCH.format(requests.utils.quote(query)), timeout=10)
             if r.status_code == 200:
-                results = r.json().get('data', [])
-                if results:
-                    return self.get_user_info(results[0]['id'])
+                # Usernames are unique, so every result is worth remembering
+                users = [self._learn_name(result) for result in r.json().get('data', [])]
+                if users:
+                    self.name_ids.set(('display', key), users[0])
+                    return self._resolved(users[0], full)
         except Exception as e:
             print(f"Error resolving by display name search: {e}")
 
         return None
 
     def get_friends(self, user_id: int) -> Optional[List]:
+        cached = self.cache.get(('friends', user_id))
+        if cached is not None:
+            return cached
         try:
-            r = requests.get(ROBLOX_FRIENDS_API.format(user_id))
-            return r.json().get('data', []) if r.status_code == 200 else None
+            r = self._get(ROBLOX_FRIENDS_API.format(user_id))
+            if r.status_code == 200:
+                friends = r.json().get('data', [])
+                self.cache.set(('friends', user_id), friends)
+                for friend in friends:
+                    self._learn_name(friend)
+                self.graph.set_friends(user_id, (f['id'] for f in friends if f.get('id')))
+                return friends
         except Exception as e:
             print(f"Error fetching friends: {e}")
-            return None
+        return self._fallback(('friends', user_id), lambda: self.get_friends(user_id))
 
     def get_user_groups(self, user_id: int) -> Optional[List[Dict]]:
+        # Cached as compact [group_id, role_id] pairs; names come from the catalog
+        pairs = self.cache.get(('groups', user_id))
+        if pairs is not None:
+            unnamed = [gid for gid, _ in pairs if int(gid) not in self.catalog.groups]
+            if unnamed:
+                self.catalog.fill(unnamed, self._get)
+            return self.catalog.expand(pairs)
         try:
-            r = requests.get(ROBLOX_GROUPS_API.format(user_id))
+            r = self._get(ROBLOX_GROUPS_API.format(user_id))
             if r.status_code == 200:
-                return [
-                    {
-                        'id':   str(g['group']['id']),
-                        'name': g['group']['name'],
-                        'role': g['role']['name']
-                    }
-                    for g in r.json().get('data', [])
-                ]
-            return None
+                pairs = [self.catalog.learn(g) for g in r.json().get('data', [])]
+                self.cache.set(('groups', user_id), pairs)
+                self.graph.set_groups(user_id, (gid for gid, _ in pairs))
+                return self.catalog.expand(pairs)
         except Exception as e:
             print(f"Error fetching groups: {e}")
+        pairs = self._fallback(('groups', user_id), lambda: self.get_user_groups(user_id))
+        return self.catalog.expand(pairs) if pairs is not None else None
+
+    def get_username_history(self, user_id: int) -> Optional[List[str]]:
+        """The user's previous usernames, newest first (first page of 100)."""
+        cached = self.cache.get(('names', user_id))
+        if cached is not None:
+            return cached
+        try:
+            r = self._get(ROBLOX_NAME_HISTORY.format(user_id))
+            if r.status_code == 200:
+                names = [n['name'] for n in r.json().get('data', []) if n.get('name')]
+                self.cache.set(('names', user_id), names)
+                return names
+        except Exception as e:
+            print(f"Error fetching username history: {e}")
+        return self._fallback(('names', user_id), lambda: self.get_username_history(user_id))
+
+    def side_lookup(self, func, *args):
+        """Start a blocking lookup on its own thread, keeping the caller's lookup priority."""
+        return self._side_pool.submit(contextvars.copy_context().run, func, *args)
+
+    def get_badge_activity(self, user_id: int) -> Optional[Dict]:
+        """{'count', 'more', 'recent'}: badges read, whether more exist, and how many were awarded recently."""
+        cached = self.cache.get(('badges', user_id))
+        if cached is not None:
+            return cached
+        try:
+            activity = self._read_badges(user_id)
+            if activity is not None:
+                self.cache.set(('badges', user_id), activity)
+                return activity
+        except Exception as e:
+            print(f"Error fetching badges: {e}")
+        return self._fallback(('badges', user_id), lambda: self.get_badge_activity(user_id))
+
+    def _read_badges(self, user_id: int) -> Optional[Dict]:
+        """
+        Stream the user's badges newest award first, a page at a time, with
+        their award dates. Stops once the counts are settled: no more pages,
+        a page reaching past the recent window (every later badge is older),
+        or BADGE_PAGE_CAP pages read. None if any page can't be fetched.
+        """
+        since  = time.time() - BADGE_RECENT_DAYS * 86400
+        count  = recent = 0
+        cursor = ''
+        for _ in range(BADGE_PAGE_CAP):
+            url = f"{ROBLOX_BADGES_API.format(user_id)}?limit={BADGE_PAGE_SIZE}&sortOrder=Desc"
+            r   = self._get(url + (f"&cursor={cursor}" if cursor else ""))
+            if r.status_code != 200:
+                return None
+            page   = r.json()
+            ids    = [b['id'] for b in page.get('data', []) if b.get('id')]
+            cursor = page.get('nextPageCursor')
+            count += len(ids)
+            if not ids:
+                break
+            r = self._get(ROBLOX_BADGE_DATES_API.format(user_id, ",".join(map(str, ids))))
+            if r.status_code != 200:
+                return None
+            awarded = [self.roblox_timestamp(d.get('awardedDate')) for d in r.json().get('data', [])]
+            awarded = [ts for ts in awarded if ts is not None]
+            recent += sum(1 for ts in awarded if ts >= since)
+            if not cursor or (awarded and min(awarded) < since):
+                break
+        return {'count': count, 'more': bool(cursor), 'recent': recent}
+
+    @staticmethod
+    def roblox_timestamp(value: str) -> Optional[float]:
+        """A Roblox API date as epoch seconds, on the same clock the month counts use."""
+        # Fractional seconds vary by endpoint: none, or anything up to 7 digits
+        try:
+            stamp, _, fraction = value.rstrip('Z').partition('.')
+            return datetime.strptime(stamp, "%Y-%m-%dT%H:%M:%S").timestamp() + float(f"0.{fraction or 0}")
+        except (AttributeError, ValueError):
             return None
 
     def get_account_age_months(self, created_date: str) -> Optional[float]:
@@ -450,25 +2580,88 @@ class RobloxChecker:
             print(f"Error calculating account age: {e}")
             return None
 
-    def find_similar_usernames(self, username: str, user_id: int) -> List[Dict]:
+    def find_similar_usernames(self, username: str, user_id: int, created_at: Optional[float] = None) -> List[Dict]:
+        """Likely alts from the username search, best first, each with its 'score' and evidence."""
+        cached = self.cache.get(('similar', user_id))
+        if cached is not None:
+            return cached
         try:
-            r = requests.get(ROBLOX_USERNAME_SEARCH.format(username))
-            if r.status_code != 200:
-                return []
-            username_lower = username.lower()
-            similar = []
-            for user in r.json().get('data', []):
-                if user.get('id') == user_id:
-                    continue
-                other = user.get('name', '').lower()
-                if (username_lower in other or
-                        other in username_lower or
-                        self._similarity(username_lower, other) > 0.6):
-                    similar.append(user)
-            return similar
+            r = self._get(ROBLOX_USERNAME_SEARCH.format(username))
+            if r.status_code == 200:
+                username_lower = username.lower()
+                similar = []
+                for user in r.json().get('data', []):
+                    if user.get('id') == user_id:
+                        continue
+                    other = user.get('name', '').lower()
+                    if (username_lower in other or
+                            other in username_lower or
+                            self._similarity(username_lower, other) > 0.6):
+                        similar.append(user)
+                similar = self._rank_alts(username_lower, user_id, created_at, similar)
+                self.cache.set(('similar', user_id), similar)
+                return similar
         except Exception as e:
             print(f"Error searching usernames: {e}")
-            return []
+        key = ('similar', user_id)
+        return self._fallback(key, lambda: self.find_similar_usernames(username, user_id, created_at)) or []
+
+    def _rank_alts(self, username: str, user_id: int, created_at: Optional[float], candidates: List[Dict]) -> List[Dict]:
+        """
+        Score candidates on name similarity, creation-time proximity and
+        mutual friends, then keep those at or above ALT_MIN_SCORE, best first.
+        """
+        # The graph only lists friends of checked targets; friend_of adds the
+        # targets that friended a candidate, and the target's own list may be cached
+        cached         = self.cache.get(('friends', user_id)) or []
+        target_friends = {int(f['id']) for f in cached if f.get('id')} | self._known_friends(user_id)
+
+        def score(c: Dict) -> float:
+            w = ALT_WEIGHTS
+            return w['name'] * c['name_score'] + w['created'] * c['created_score'] + w['mutual'] * min(c['mutual'], 5) / 5
+
+        ranked = []
+        for user in candidates:
+            other = user.get('name', '').lower()
+            uid   = user.get('id')
+            # Roblox IDs are sequential, so the ID gap orders accounts by creation time
+            gap   = abs(int(uid) - int(user_id)) if str(uid).isdigit() and str(user_id).isdigit() else None
+            ranked.append({
+                'id':            uid,
+                'name':          user.get('name'),
+                'displayName':   user.get('displayName'),
+                'name_score':    0.85 if username in other or other in username else SequenceMatcher(None, username, other).ratio(),
+                'created_score': 0.0 if gap is None else max(0.0, 1 - math.log10(gap + 1) / 9),
+                'created':       None,
+                'days_apart':    None,
+                'mutual':        len(target_friends & self._known_friends(uid)) if target_friends and uid else 0,
+            })
+        for c in ranked:
+            c['score'] = score(c)
+        ranked.sort(key=lambda c: c['score'], reverse=True)
+
+        # Exact creation dates for the front-runners, as many as arrive within the budget
+        if created_at is not None and ranked:
+            top  = ranked[:ALT_ENRICH_LIMIT]
+            jobs = {self.side_lookup(self.get_user_info, c['id']): c for c in top}
+            done, _ = wait_futures(jobs, timeout=ALT_ENRICH_BUDGET)
+            for job in done:
+                info    = job.result() if job.exception() is None else None
+                created = self.roblox_timestamp((info or {}).get('created'))
+                if created is None:
+                    continue
+                c = jobs[job]
+                c['created']       = created
+                c['days_apart']    = int(abs(created - created_at) // 86400)
+                c['created_score'] = 1 / (1 + c['days_apart'] / ALT_CREATION_DAYS)
+                c['score']         = score(c)
+            ranked.sort(key=lambda c: c['score'], reverse=True)
+
+        return [c for c in ranked if c['score'] >= ALT_MIN_SCORE]
+
+    def _known_friends(self, user_id) -> set:
+        """Friends of `user_id` the relationship graph knows about, from either side."""
+        return set(self.graph.friends.get(int(user_id), ())) | set(self.graph.friended_by(user_id))
 
     def _similarity(self, a: str, b: str) -> float:
         ca = re.sub(r'[^a-z]', '', a)
@@ -478,16 +2671,24 @@ class RobloxChecker:
         return sum(1 for c in ca if c in cb) / max(len(ca), len(cb))
 
     def get_group_join_date(self, group_id: str, user_id: int) -> Optional[str]:
+        cached = self.cache.get(('group_join', group_id, user_id))
+        if cached is not None:
+            return cached or None
         try:
-            r = requests.get(f"https://groups.roblox.com/v1/groups/{group_id}/users?limit=100")
+            r = self._get(f"https://groups.roblox.com/v1/groups/{group_id}/users?limit=100")
             if r.status_code == 200:
-                for member in r.json().get('data', []):
-                    if member.get('userId') == user_id:
-                        return member.get('joinedDate') or member.get('created')
-            return None
+                joined = next(
+                    (m.get('joinedDate') or m.get('created')
+                     for m in r.json().get('data', []) if m.get('userId') == user_id),
+                    None
+                )
+                # '' caches "not found" so it isn't looked up again until expiry
+                self.cache.set(('group_join', group_id, user_id), joined or '')
+                return joined
         except Exception as e:
             print(f"Error fetching group join date: {e}")
-            return None
+        key = ('group_join', group_id, user_id)
+        return self._fallback(key, lambda: self.get_group_join_date(group_id, user_id)) or None
 
     def get_join_date_months_ago(self, join_date_str: str) -> Optional[float]:
         try:
@@ -499,204 +2700,1190 @@ class RobloxChecker:
     def check_blacklisted_groups(self, user_groups: List[Dict]) -> List[Dict]:
         return [g for g in user_groups if g['id'] in self.blacklisted_groups]
 
+    # ── Check pipeline ─────────────────────────────────────────────────────────
+    def gather(self, user_info: Dict, needs=ALL_NEEDS) -> Dict:
+        """
+        Fetch (or take from cache) the data a verdict depends on.
+
+        `needs` limits fetching to what the active rules use — e.g. without
+        'friends' the friends list is never requested (see CompiledRules).
+        """
+        username     = user_info.get('name', 'Unknown')
+        user_id      = user_info.get('id')
+        created_date = user_info.get('created', '')
+        self.graph.set_name(user_id, username)
+
+        # Runs while the lookups below do
+        past_names = self.side_lookup(self.get_username_history, user_id) if 'names' in needs else None
+        badges     = self.side_lookup(self.get_badge_activity, user_id) if 'badges' in needs else None
 
-checker = RobloxChecker()
+        friends     = self.get_friends(user_id) if 'friends' in needs else None
+        user_groups = self.get_user_groups(user_id) if 'groups' in needs else None
+
+        # CUSA check
+        cusa_membership = next((g for g in user_groups or [] if g['id'] == CUSA_GROUP_ID), None)
+        cusa_join_date  = None
+        if cusa_membership and 'cusa' in needs:
+            cusa_join_date = self.get_group_join_date(CUSA_GROUP_ID, user_id)
+
+        return {
+            'username':        username,
+            'user_id':         user_id,
+            'needs':           frozenset(needs),
+            'friends_count':   len(friends) if friends is not None else None,
+            'user_groups':     user_groups,
+            'age_months':      self.get_account_age_months(created_date),
+            'created_at':      self.roblox_timestamp(created_date),
+            'similar_users':   self.find_similar_usernames(username, user_id, self.roblox_timestamp(created_date))
+                               if 'alts' in needs else [],
+            'cusa_membership': cusa_membership,
+            'cusa_months_in':  self.get_join_date_months_ago(cusa_join_date) if cusa_join_date else None,
+            'cusa_joined_at':  self.roblox_timestamp(cusa_join_date) if cusa_join_date else None,
+            'past_names':      (past_names.result() or []) if past_names else [],
+            'badges':          badges.result() if badges else None,
+            **self._freshness(self._data_stamps(user_id, needs, cusa_membership is not None)),
+        }
+
+    def _freshness(self, stamps: tuple) -> Dict:
+        """
+        `stamps`, plus which inputs were served stale ({kind: stored_at}) or
+        couldn't be fetched at all ([kind]) — anything not freshly cached.
+        """
+        stale, unavailable = {}, []
+        for key, stored_at in stamps:
+            if stored_at is None:
+                item = self.cache.get_stale(key)
+                if item is not None:
+                    stale[key[0]] = item[1]
+                else:
+                    unavailable.append(key[0])
+        return {'stamps': stamps, 'stale': stale, 'unavailable': unavailable}
+
+    def _data_stamps(self, user_id: int, needs, cusa_member: bool) -> tuple:
+        """(cache key, stored_at) for every input behind a profile; None = not cached."""
+        keys = [('user', user_id)]
+        if 'friends' in needs:
+            keys.append(('friends', user_id))
+        if 'groups' in needs:
+            keys.append(('groups', user_id))
+        if 'names' in needs:
+            keys.append(('names', user_id))
+        if 'badges' in needs:
+            keys.append(('badges', user_id))
+        if 'alts' in needs:
+            keys.append(('similar', user_id))
+        if 'cusa' in needs and cusa_member:
+            keys.append(('group_join', CUSA_GROUP_ID, user_id))
+        return tuple((k, self.cache.stored_at(k)) for k in keys)
+
+    def evaluate(self, data: Dict) -> Dict:
+        """
+        Build a rule-independent risk profile from gathered data. Pure — no
+        network — so cached data can be re-scored when the blacklists change.
+        """
+        username     = data['username']
+        user_id      = data['user_id']
+        blacklisted  = self.check_blacklisted_groups(data['user_groups'] or [])
+        dhs_entry, hor_entry, senate_entry = self.listings(username, user_id, data.get('past_names') or [])
+        lookalikes   = self.lookalikes(username, user_id)
+
+        return {
+            **data,
+            'blacklisted':  blacklisted,
+            'dhs_entry':    dhs_entry,
+            'hor_entry':    hor_entry,
+            'senate_entry': senate_entry,
+            'lookalikes':   lookalikes,
+            'signals': {
+                'alts':               len(data['similar_users']),
+                'blacklisted_groups': len(blacklisted),
+                'dhs':                ('removed' if dhs_entry.get('removed') else 'active') if dhs_entry else None,
+                'hor':                hor_entry is not None,
+                'senate':             senate_entry is not None,
+                'friends':            data['friends_count'],
+                'account_months':     data['age_months'],
+                'cusa_member':        data['cusa_membership'] is not None,
+                'cusa_months':        data['cusa_months_in'],
+                'lookalikes':         len(lookalikes),
+                'badges':             data['badges']['count'] if data.get('badges') else None,
+                'badges_more':        bool(data.get('badges') and data['badges']['more']),
+            },
+            'generation':   self.blacklist_generation,
+            'evaluated_at': time.time(),
+        }
+
+    def risk_profile(self, user_info: Dict, rules: Optional[CompiledRules] = None, needs=None) -> Dict:
+        """
+        Cached `evaluate(gather(...))` with `rules` applied.
+
+        A stored profile is reused while the blacklist generation and the
+        cache timestamps of all its inputs are unchanged, as long as it
+        covers `needs` (default: everything the rules use). The verdict
+        (`factors`, `hard_fail`) is always recomputed from the rules.
+        `profile['cached']` says whether the profile was reused.
+        """
+        rules   = rules or default_rules
+        needs   = rules.needs if needs is None else needs
+        user_id = user_info.get('id')
+        cached  = self.profiles.get(user_id)
+        if (cached is not None and
+                cached['generation'] == self.blacklist_generation and
+                needs <= cached['needs'] and
+                all(self.cache.stored_at(k) == ts for k, ts in cached['stamps'])):
+            return {**cached, **rules.apply(cached), 'cached': True}
+
+        profile = self.evaluate(self.gather(user_info, needs))
+        # Only cache profiles whose inputs can all be re-validated later
+        if all(ts is not None for _, ts in profile['stamps']):
+            self.profiles.set(user_id, profile)
+        self.columns.update(profile)
+        return {**profile, **rules.apply(profile), 'cached': False}
+
+
+class Watchlist:
+    """
+    Linked Roblox IDs that the sweeper keeps re-checking, persisted as JSON.
+
+    Each member records the last verdict and the data it was based on, so a
+    blacklist reload only marks the members it actually affects as dirty and
+    everyone else waits until their cached Roblox data has expired. Members
+    added, changed or removed here since the last save are tracked so a save
+    merges them into whatever other processes wrote meanwhile.
+    """
+
+    def __init__(self, path: str):
+        self.path     = path
+        self.members  = {}     # str(user_id) -> member dict
+        self.stamp    = None
+        self._changed = set()  # keys added or updated since the last save
+        self._removed = set()  # keys removed since the last save
+        self.load()
+
+    def load(self):
+        try:
+            self.stamp   = file_stamp(self.path)
+            self.members = read_json(self.path)
+            print(f"[Watchlist] Loaded {len(self.members)} member(s)")
+        except FileNotFoundError:
+            self.members = {}
+        except Exception as e:
+            print(f"[Watchlist] Error loading {self.path}: {e}")
+            self.members = {}
+
+    def refresh(self):
+        """Pick up members another process added, changed or removed, keeping unsaved edits."""
+        stamp = file_stamp(self.path)
+        if stamp == self.stamp:
+            return
+        try:
+            stored = read_json(self.path)
+        except Exception as e:
+            print(f"[Watchlist] Error reloading {self.path}: {e}")
+            return
+        merged = {k: m for k, m in stored.items() if k not in self._removed}
+        merged.update((k, self.members[k]) for k in self._changed if k in self.members)
+        self.members = merged
+        self.stamp   = stamp
+
+    def save(self):
+        try:
+            with locked_file(self.path):
+                self.refresh()
+                tmp = f"{self.path}.tmp"
+                with open(tmp, 'w', encoding='utf-8') as f:
+                    json.dump(self.members, f)
+                os.replace(tmp, self.path)
+                self.stamp = file_stamp(self.path)
+            self._changed.clear()
+            self._removed.clear()
+        except Exception as e:
+            print(f"[Watchlist] Error saving {self.path}: {e}")
+
+    def add(self, user_id: int, username: str, guild_id: Optional[int],
+            channel_id: Optional[int], added_by: int) -> bool:
+        self.refresh()
+        key = str(user_id)
+        if key in self.members:
+            return False
+        self.members[key] = {
+            'username':     username,
+            'guild_id':     guild_id,
+            'channel_id':   channel_id,
+            'added_by':     added_by,
+            'group_ids':    [],
+            'passed':       None,   # unknown until the first sweep
+            'factors':      [],
+            'last_checked': 0,
+            'dirty':        True,
+        }
+        self._changed.add(key)
+        self._removed.discard(key)
+        self.save()
+        return True
+
+    def remove(self, user_id: int) -> bool:
+        self.refresh()
+        key = str(user_id)
+        if self.members.pop(key, None) is None:
+            return False
+        self._removed.add(key)
+        self._changed.discard(key)
+        self.save()
+        return True
+
+    def mark_affected(self, changes: Dict) -> int:
+        """Flag members touched by a blacklist reload for re-evaluation."""
+        if not any(changes.values()):
+            return 0
+        self.refresh()
+        marked = 0
+        for key, m in self.members.items():
+            if (key in changes['user_ids'] or
+                    m.get('username', '').lower() in changes['usernames'] or
+                    changes['group_ids'].intersection(m.get('group_ids', []))):
+                self.mark_dirty(key)
+                marked += 1
+        if marked:
+            self.save()
+        return marked
+
+    def mark_dirty(self, key: str):
+        self.members[key]['dirty'] = True
+        self._changed.add(key)
+
+    def due(self, limit: int) -> List[str]:
+        """Dirty members first, then members whose cached data has expired, oldest first."""
+        now   = time.time()
+        dirty = [k for k, m in self.members.items() if m.get('dirty')]
+        stale = sorted(
+            (k for k, m in self.members.items()
+             if not m.get('dirty') and now - m.get('last_checked', 0) > ROBLOX_CACHE_TTL),
+            key=lambda k: self.members[k].get('last_checked', 0)
+        )
+        return (dirty + stale)[:limit]
+
+    def record(self, key: str, report: Dict) -> bool:
+        """Store a sweep result. Returns True if the member flipped from pass to fail."""
+        m = self.members[key]
+        m['username']     = report['username']
+        m['group_ids']    = [g['id'] for g in report['user_groups'] or []]
+        m['last_checked'] = time.time()
+        return self.set_verdict(key, not report['hard_fail'], report['factors'])
+
+    def set_verdict(self, key: str, passed: bool, factors: List[str]) -> bool:
+        """Store a verdict re-scored from existing data. Returns True on a pass → fail flip."""
+        m = self.members[key]
+        was_passing = m.get('passed')
+
+        m['passed']  = passed
+        m['factors'] = factors
+        m['dirty']   = False
+        self._changed.add(key)
+        return was_passing is True and not passed
+
+
+class CheckHistory:
+    """
+    Append-only log of /background-check results in SQLite (WAL mode).
+
+    Indexed by Roblox ID, moderator and time, so the last result for a user
+    comes back without any Roblox calls. Factors, source hits and signals
+    are stored as JSON text. The database is opened on first use.
+    """
+
+    COLUMNS = ('id', 'roblox_id', 'username', 'moderator_id', 'guild_id', 'checked_at',
+               'passed', 'complete', 'factors', 'hits', 'signals', 'elapsed_ms', 'generation')
+
+    def __init__(self, path: str):
+        self.path  = path
+        self._db   = None
+        self._lock = threading.Lock()
+
+    @property
+    def db(self):
+        # Callers hold self._lock
+        if self._db is None:
+            self._db = self._open()
+        return self._db
+
+    def _open(self):
+        db = sqlite3.connect(self.path, check_same_thread=False, timeout=10)
+        db.row_factory = sqlite3.Row
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        db.executescript("""
+            CREATE TABLE IF NOT EXISTS checks (
+                id           INTEGER PRIMARY KEY,
+                roblox_id    INTEGER NOT NULL,
+                username     TEXT    NOT NULL,
+                moderator_id INTEGER,
+                guild_id     INTEGER,
+                checked_at   REAL    NOT NULL,
+                passed       INTEGER NOT NULL,
+                complete     INTEGER NOT NULL,
+                factors      TEXT    NOT NULL,
+                hits         TEXT    NOT NULL,
+                signals      TEXT    NOT NULL,
+                elapsed_ms   REAL,
+                generation   INTEGER
+            );
+            CREATE INDEX IF NOT EXISTS checks_roblox    ON checks (roblox_id, checked_at);
+            CREATE INDEX IF NOT EXISTS checks_username  ON checks (username COLLATE NOCASE, checked_at);
+            CREATE INDEX IF NOT EXISTS checks_moderator ON checks (moderator_id, checked_at);
+            CREATE INDEX IF NOT EXISTS checks_time      ON checks (checked_at);
+        """)
+        count = db.execute("SELECT COUNT(*) FROM checks").fetchone()[0]
+        print(f"[History] {count} check(s) in {self.path}")
+        return db
+
+    def record(self, report: Dict, moderator_id: Optional[int], guild_id: Optional[int],
+               complete: bool, elapsed_ms: float):
+        dhs_entry = report['dhs_entry']
+        hits = {
+            'groups': [g['id'] for g in report['blacklisted']],
+            'dhs':    ('removed' if dhs_entry.get('removed') else 'active') if dhs_entry else None,
+            'hor':    report['hor_entry'] is not None,
+            'senate': report['senate_entry'] is not None,
+        }
+        row = (
+            report['user_id'], report['username'], moderator_id, guild_id, time.time(),
+            int(not report['hard_fail']), int(complete),
+            json.dumps(report['factors']), json.dumps(hits), json.dumps(report['signals']),
+            round(elapsed_ms, 1), report['generation'],
+        )
+        try:
+            with self._lock, self.db:
+                self.db.execute(
+                    "INSERT INTO checks (roblox_id, username, moderator_id, guild_id, checked_at, passed,"
+                    " complete, factors, hits, signals, elapsed_ms, generation)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", row)
+        except sqlite3.Error as e:
+            print(f"[History] Error recording check for {report['user_id']}: {e}")
+
+    def _rows(self, where: str, args: tuple, limit: Optional[int]) -> List[Dict]:
+        sql = f"SELECT * FROM checks WHERE {where} ORDER BY checked_at DESC"
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+        with self._lock:
+            rows = self.db.execute(sql, args).fetchall()
+        return [
+            {**dict(r), 'factors': json.loads(r['factors']), 'hits': json.loads(r['hits']),
+             'signals': json.loads(r['signals'])}
+            for r in rows
+        ]
+
+    def query(self, user: Optional[str] = None, moderator_id: Optional[int] = None,
+              since: Optional[float] = None, limit: Optional[int] = HISTORY_LIMIT) -> List[Dict]:
+        """Matching checks, newest first. `user` is a Roblox ID or (case-insensitive) username."""
+        where, args = ["1"], []
+        if user:
+            user = user.strip().lstrip('@')
+            if user.isdigit():
+                where.append("roblox_id = ?")
+                args.append(int(user))
+            else:
+                where.append("username = ? COLLATE NOCASE")
+                args.append(user)
+        if moderator_id is not None:
+            where.append("moderator_id = ?")
+            args.append(moderator_id)
+        if since is not None:
+            where.append("checked_at >= ?")
+            args.append(since)
+        return self._rows(" AND ".join(where), tuple(args), limit)
+
+    @classmethod
+    def to_csv(cls, rows: List[Dict]) -> str:
+        buf    = io.StringIO()
+        writer = csv.writer(buf)
+        writer.writerow(cls.COLUMNS)
+        for r in rows:
+            writer.writerow([
+                datetime.fromtimestamp(r[c]).isoformat(timespec='seconds') if c == 'checked_at'
+                else json.dumps(r[c]) if c in ('factors', 'hits', 'signals')
+                else r[c]
+                for c in cls.COLUMNS
+            ])
+        return buf.getvalue()
+
+
+class FriendScans:
+    """
+    Last /friend-check result per target, persisted as JSON.
+
+    Per friend it keeps the group IDs, past usernames and the hits, plus
+    the digest of the blacklists the hits were computed under, so a rescan only
+    fetches friends it hasn't seen and re-scores the rest locally when the
+    blacklists changed.
+    """
+
+    def __init__(self, path: str):
+        self.path    = path
+        self.targets = {}  # str(target_id) -> {'digest', 'scanned_at', 'friends': {str(fid): friend}}
+        self.stamp   = None
+        self._lock   = threading.Lock()  # get/store run on the worker pool
+        self.load()
+
+    def load(self):
+        try:
+            self.stamp   = file_stamp(self.path)
+            self.targets = read_json(self.path)
+            print(f"[FriendScans] Loaded {len(self.targets)} target(s)")
+        except FileNotFoundError:
+            self.targets = {}
+        except Exception as e:
+            print(f"[FriendScans] Error loading {self.path}: {e}")
+            self.targets = {}
+
+    def refresh(self):
+        """Merge in scans other processes saved; per target the later scan wins."""
+        stamp = file_stamp(self.path)
+        if stamp == self.stamp:
+            return
+        try:
+            stored = read_json(self.path)
+        except Exception as e:
+            print(f"[FriendScans] Error reloading {self.path}: {e}")
+            return
+        for key, record in stored.items():
+            mine = self.targets.get(key)
+            if mine is None or mine.get('scanned_at', 0) < record.get('scanned_at', 0):
+                self.targets[key] = record
+        # Insertion order doubles as scan order
+        self.targets = dict(sorted(self.targets.items(), key=lambda kv: kv[1].get('scanned_at', 0)))
+        self.stamp   = stamp
+
+    def save(self):
+        try:
+            with locked_file(self.path):
+                self.refresh()
+                while len(self.targets) > FRIEND_SCAN_TARGETS:
+                    del self.targets[next(iter(self.targets))]
+                tmp = f"{self.path}.tmp"
+                with open(tmp, 'w', encoding='utf-8') as f:
+                    json.dump(self.targets, f, separators=(',', ':'))
+                os.replace(tmp, self.path)
+                self.stamp = file_stamp(self.path)
+        except Exception as e:
+            print(f"[FriendScans] Error saving {self.path}: {e}")
+
+    def get(self, target_id: int) -> Optional[Dict]:
+        """Blocking — reads the file if another process rewrote it."""
+        with self._lock:
+            self.refresh()
+            return self.targets.get(str(target_id))
+
+    def store(self, target_id: int, record: Dict):
+        """Blocking — rewrites the whole file."""
+        with self._lock:
+            self.targets.pop(str(target_id), None)
+            self.targets[str(target_id)] = record
+            self.save()
+
+
+checker       = RobloxChecker()
+watchlist     = Watchlist(WATCHLIST_PATH)
+history       = CheckHistory(HISTORY_PATH)
+friend_scans  = FriendScans(FRIEND_SCANS_PATH)
+guild_rules   = GuildRules(GUILD_RULES_PATH)
+default_rules = CompiledRules(guild_rules.config(None))
+
+roblox_pool = ThreadPoolExecutor(max_workers=ROBLOX_WORKERS, thread_name_prefix="roblox")
+
+
+async def run_blocking(func, *args):
+    """Run a blocking checker call on the shared, bounded Roblox worker pool."""
+    # Copy the context so the scheduler sees the calling command's lookup_context
+    ctx = contextvars.copy_context()
+    return await asyncio.get_running_loop().run_in_executor(roblox_pool, ctx.run, func, *args)
+
+
+def schedule_lookups(interaction: discord.Interaction, priority: int = PRIORITY_INTERACTIVE):
+    """Tag the current command's Roblox lookups with a priority class, fair-queue keys and deadline."""
+    age = (discord.utils.utcnow() - interaction.created_at).total_seconds()
+    lookup_context.set({
+        'priority':  priority,
+        'guild':     interaction.guild_id,
+        'moderator': interaction.user.id,
+        'deadline':  time.monotonic() + INTERACTION_LIFETIME - age,
+        'requests':  0,
+    })
+
+
+def narrow_lookup_deadline(deadline: float):
+    """Drop the current command's lookups that would finish after `deadline` (monotonic)."""
+    ctx = lookup_context.get()
+    if ctx is not None:
+        ctx['deadline'] = min(ctx['deadline'], deadline)
+
+
+reload_lock = asyncio.Lock()   # one blacklist reload at a time
+
+
+async def reload_blacklists(refresh: bool = False):
+    """
+    Reload every source and flag the watchlist members the changes affect.
+
+    Behind a sidecar this only re-reads the shared snapshot; `refresh=True`
+    first asks the sidecar to re-fetch the sheets.
+    """
+    async with reload_lock:
+        if refresh and checker.sidecar:
+            await run_blocking(lambda: checker.sidecar.call('reload', timeout=120))
+        results, changes = await checker.reload_all()
+        # Keep a local copy so the next start can serve checks before the sheets load.
+        # A source that failed to refresh is still the old mapping — leave that snapshot alone.
+        if not checker.sidecar and any(results.values()):
+            unrefreshed = checker.mapped_sources()
+            if unrefreshed:
+                print(f"[Snapshot] Not rewritten — {', '.join(unrefreshed)} didn't refresh")
+            else:
+                await run_blocking(checker.write_snapshot, BLACKLIST_SNAPSHOT_PATH)
+    marked = watchlist.mark_affected(changes)
+    if any(changes.values()):
+        # Everyone with stored rule inputs is re-scored in place; affected members without them wait for the sweeper
+        rescored, _ = await rescore_members(list(watchlist.members), queue_missing=False)
+        queued = sum(1 for m in watchlist.members.values() if m.get('dirty'))
+        print(f"[Watchlist] {marked} member(s) affected — {rescored} re-scored, {queued} queued for re-check")
+    return results, changes
+
+
+# ── Startup ────────────────────────────────────────────────────────────────────
+# init_ms is the local work before connecting (imports, globals); on_ready only
+# does local work and leaves command sync and the blacklist refresh running.
+startup = {'init_ms': 0.0, 'ready': False, 'sync': None, 'refresh': None}
+
+
+def command_fingerprint(guild=None) -> str:
+    """Hash of the command tree's API payload — changes whenever a definition does."""
+    payload = []
+    for command in bot.tree.get_commands(guild=guild):
+        try:
+            payload.append(command.to_dict(bot.tree))   # discord.py 2.4+
+        except TypeError:
+            payload.append(command.to_dict())
+    payload.sort(key=lambda c: (c.get('type', 1), c['name']))
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+
+def load_fingerprints() -> Dict[str, str]:
+    try:
+        with open(COMMAND_FINGERPRINT_PATH, encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except Exception as e:
+        print(f"[Sync] Error loading {COMMAND_FINGERPRINT_PATH}: {e}")
+        return {}
+
+
+def save_fingerprints(fingerprints: Dict[str, str]):
+    try:
+        tmp = f"{COMMAND_FINGERPRINT_PATH}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(fingerprints, f, indent=2)
+        os.replace(tmp, COMMAND_FINGERPRINT_PATH)
+    except Exception as e:
+        print(f"[Sync] Error saving {COMMAND_FINGERPRINT_PATH}: {e}")
+
+
+async def sync_commands():
+    """
+    Sync the command tree, unless it matches what was last synced for this
+    application and scope (global, or DEV_GUILD_ID).
+    """
+    guild = discord.Object(id=DEV_GUILD_ID) if DEV_GUILD_ID else None
+    if guild:
+        bot.tree.copy_global_to(guild=guild)
+    scope       = f"{bot.application_id}:{f'guild:{DEV_GUILD_ID}' if guild else 'global'}"
+    fingerprint = command_fingerprint(guild)
+
+    fingerprints = load_fingerprints()
+    if fingerprints.get(scope) == fingerprint and not FORCE_COMMAND_SYNC:
+        print(f"[Sync] Commands unchanged ({scope}) — skipping sync")
+        return
+    try:
+        synced = await bot.tree.sync(guild=guild)
+        print(f"Synced {len(synced)} command(s)" + (f" to guild {DEV_GUILD_ID}" if guild else ""))
+        fingerprints[scope] = fingerprint
+        save_fingerprints(fingerprints)
+    except Exception as e:
+        print(f"Error syncing commands: {e}")
+
+
+async def refresh_blacklists():
+    started = time.perf_counter()
+    results, _ = await reload_blacklists()
+    print(f"[Startup] Blacklists refreshed ({sum(results.values())}/{len(results)} sources) "
+          f"in {time.perf_counter() - started:.1f}s")
+
+
+async def load_blacklist_snapshot():
+    if os.path.exists(BLACKLIST_SNAPSHOT_PATH):
+        await asyncio.get_running_loop().run_in_executor(None, checker.load_snapshot, BLACKLIST_SNAPSHOT_PATH)
+        checker.catalog.set_blacklisted(checker.blacklisted_groups)
 
 
 @bot.event
 async def on_ready():
+    handler_started = time.perf_counter()
     print(f'{bot.user} has connected to Discord!')
-    await checker.fetch_blacklist()
-    await checker.fetch_dhs()
-    await checker.fetch_hor()
-    await checker.fetch_senate()
+
+    if not startup['ready']:
+        startup['ready'] = True
+        # Serve checks from the last snapshot until the refresh below replaces it
+        await load_blacklist_snapshot()
+        # Commands can't change while running, so reconnects never re-sync.
+        # With several shard processes only the one owning shard 0 syncs.
+        if not SHARD_IDS or 0 in SHARD_IDS:
+            startup['sync'] = asyncio.create_task(sync_commands())
+
+    # The refresh doesn't hold up readiness; tasks are kept in `startup` so they aren't collected
+    if startup['refresh'] is None or startup['refresh'].done():
+        startup['refresh'] = asyncio.create_task(refresh_blacklists())
+
+    # Each shard process keeps its own watchlist file, so each sweeps its own members
+    if not watch_sweeper.is_running():
+        watch_sweeper.start()
+    if checker.sidecar and not snapshot_watcher.is_running():
+        snapshot_watcher.start()
+
+    local_ms = startup['init_ms'] + (time.perf_counter() - handler_started) * 1000
+    print(f"[Startup] Ready after {local_ms:.0f} ms of local work "
+          f"({time.perf_counter() - STARTUP_STARTED:.1f}s including connecting to Discord)")
+
+
+@tasks.loop(seconds=SNAPSHOT_POLL_SECONDS)
+async def snapshot_watcher():
+    """Pick up blacklist snapshots the sidecar has rewritten since the last load."""
     try:
-        synced = await bot.tree.sync()
-        print(f"Synced {len(synced)} command(s)")
-    except Exception as e:
-        print(f"Error syncing commands: {e}")
+        mtime = os.path.getmtime(BLACKLIST_SNAPSHOT_PATH)
+    except OSError:
+        return
+    if mtime != getattr(snapshot_watcher, 'last_mtime', None):
+        if hasattr(snapshot_watcher, 'last_mtime'):
+            await reload_blacklists()
+        snapshot_watcher.last_mtime = mtime
+
+
+# ── Watchlist sweeper ──────────────────────────────────────────────────────────
+def sweep_member(key: str) -> Optional[Dict]:
+    """Blocking re-check of one watchlist member; runs off the event loop."""
+    user_info = checker.get_user_info(int(key))
+    if not user_info or user_info.get('errors'):
+        return None
+    # Only fetch what can change pass/fail — factor-only rules are skipped
+    rules = guild_rules.for_guild(watchlist.members.get(key, {}).get('guild_id'))
+    return checker.risk_profile(user_info, rules, needs=rules.verdict_needs)
 
 
-@bot.tree.command(name="background-check", description="Run a full background check on a Roblox user")
-@app_commands.describe(user="Roblox user ID, username, or display name")
-async def background_check(interaction: discord.Interaction, user: str):
-    await interaction.response.defer()
+async def send_watch_alert(key: str, member: Dict, report: Dict):
+    channel_id = WATCHLIST_ALERT_CHANNEL_ID or member.get('channel_id') or 0
+    channel    = bot.get_channel(channel_id)
+    if channel is None and channel_id:
+        # The alert channel may belong to a guild on another shard process
+        try:
+            channel = await bot.fetch_channel(channel_id)
+        except Exception as e:
+            print(f"[Watchlist] Error fetching alert channel {channel_id}: {e}")
+    if channel is None:
+        print(f"[Watchlist] No alert channel for {member.get('username')} ({key})")
+        return
+
+    profile_url = ROBLOX_PROFILE_URL.format(key)
+    embed = discord.Embed(
+        title="Watchlist Alert — Now Failing",
+        color=discord.Color.red(),
+        timestamp=datetime.now()
+    )
+    embed.add_field(name="Target",  value=f"[{report['username']}]({profile_url}) | `{key}`", inline=False)
+    embed.add_field(name="Factors", value="\n".join(f"• {f}" for f in report['factors']) or "None", inline=False)
+    embed.add_field(name="Result",  value="✅ Passed → ❌ Failed", inline=False)
+    if member.get('added_by'):
+        embed.add_field(name="Added By", value=f"<@{member['added_by']}>", inline=False)
+    embed.set_footer(text=f"Roblox ID: {key}")
 
     try:
-        # ── Resolve the user ───────────────────────────────────────────────────
-        user_info = checker.resolve_user(user)
-        if not user_info or user_info.get('errors'):
-            await interaction.followup.send(f"❌ Could not find a Roblox user matching `{user}`.")
-            return
+        await channel.send(embed=embed)
+    except Exception as e:
+        print(f"[Watchlist] Error sending alert: {e}")
 
-        # name = @username (the unique login name), displayName = in-game display name
-        username     = user_info.get('name', 'Unknown')        # @username — used for all checks
-        display_name = user_info.get('displayName', username)  # display name — shown as extra info
-        user_id      = user_info.get('id')
-        created_date = user_info.get('created', '')
-        profile_url  = ROBLOX_PROFILE_URL.format(user_id)
 
-        friends       = checker.get_friends(user_id)
-        user_groups   = checker.get_user_groups(user_id) or []
-        age_months    = checker.get_account_age_months(created_date)
-        similar_users = checker.find_similar_usernames(username, user_id)
-        blacklisted   = checker.check_blacklisted_groups(user_groups)
-        dhs_entry     = checker.check_dhs(username, user_id)
-        hor_entry     = checker.check_hor(username, user_id)
-        senate_entry  = checker.check_senate(username, user_id)
+@tasks.loop(minutes=SWEEP_INTERVAL_MINUTES)
+async def watch_sweeper():
+    watchlist.refresh()   # --http workers add and remove members in the same file
+    due = watchlist.due(SWEEP_BUDGET)
+    if not due:
+        return
 
-        # CUSA check
-        cusa_membership = next((g for g in user_groups if g['id'] == CUSA_GROUP_ID), None)
-        cusa_months_in  = None
-        if cusa_membership:
-            cusa_join_date = checker.get_group_join_date(CUSA_GROUP_ID, user_id)
-            if cusa_join_date:
-                cusa_months_in = checker.get_join_date_months_ago(cusa_join_date)
-
-        friends_count = len(friends) if friends is not None else None
-
-        # ── Format each field ──────────────────────────────────────────────────
-
-        # Suspicious alts
-        if similar_users:
-            alt_lines  = [
-                f"[{u.get('name')}]({ROBLOX_PROFILE_URL.format(u.get('id'))})"
-                for u in similar_users[:5]
-            ]
-            alts_value = ", ".join(alt_lines)
-            if len(similar_users) > 5:
-                alts_value += f" (+{len(similar_users) - 5} more)"
-        else:
-            alts_value = "None"
+    flipped = 0
+    for key in due:
+        try:
+            report = await run_blocking(sweep_member, key)
+        except Exception as e:
+            print(f"[Watchlist] Error checking {key}: {e}")
+            report = None
+
+        # Member may have been removed while the check was running
+        if report is not None and key in watchlist.members:
+            if watchlist.record(key, report):
+                flipped += 1
+                await send_watch_alert(key, watchlist.members[key], report)
+
+        await asyncio.sleep(SWEEP_MEMBER_DELAY)
+
+    watchlist.save()
+    await run_blocking(checker.graph.save)
+    print(f"[Watchlist] Swept {len(due)} member(s), {flipped} new failure(s)")
+
+
+FRESHNESS_LABELS = {
+    'user':       "Profile",
+    'friends':    "Friends",
+    'groups':     "Groups",
+    'similar':    "Alt search",
+    'names':      "Past usernames",
+    'badges':     "Badges",
+    'group_join': "CUSA join date",
+}
+
+
+SOURCE_LABELS = {'dhs': "DHS", 'hor': "HoR", 'senate': "Senate"}
+
+
+def build_report_embed(agent: str, user_info: Dict, report: Dict, rules: CompiledRules) -> discord.Embed:
+    """
+    Render a risk profile as the background check embed.
+
+    Data the rules use but `report` hasn't loaded yet (a fast verdict) is
+    shown as not loaded; data for disabled rules as not checked.
+    """
+    # name = @username (the unique login name), displayName = in-game display name
+    username     = user_info.get('name', 'Unknown')        # @username — used for all checks
+    display_name = user_info.get('displayName', username)  # display name — shown as extra info
+    user_id      = user_info.get('id')
+    profile_url  = ROBLOX_PROFILE_URL.format(user_id)
+
+    friends_count   = report['friends_count']
+    user_groups     = report['user_groups']
+    age_months      = report['age_months']
+    similar_users   = report['similar_users']
+    blacklisted     = report['blacklisted']
+    dhs_entry       = report['dhs_entry']
+    hor_entry       = report['hor_entry']
+    senate_entry    = report['senate_entry']
+    cusa_membership = report['cusa_membership']
+    cusa_months_in  = report['cusa_months_in']
+    pending         = rules.needs - report['needs']
+    not_loaded      = "⏳ Not loaded"
+    unavailable     = "⚠️ Unavailable (Roblox not responding)"
+
+    # ── Format each field ──────────────────────────────────────────────────────
+
+    # Suspicious alts
+    if 'alts' in pending:
+        alts_value = not_loaded
+    elif similar_users:
+        alt_lines = []
+        for u in similar_users[:5]:
+            evidence = []
+            if u.get('days_apart') is not None:
+                evidence.append(f"created {u['days_apart']} day(s) apart")
+            if u.get('mutual'):
+                evidence.append(f"{u['mutual']} mutual friend(s)")
+            line = f"[{u.get('name')}]({ROBLOX_PROFILE_URL.format(u.get('id'))})"
+            alt_lines.append(f"{line} — {', '.join(evidence)}" if evidence else line)
+        alts_value = "\n".join(alt_lines)
+        if len(similar_users) > 5:
+            alts_value += f"\n(+{len(similar_users) - 5} more)"
+    else:
+        alts_value = "None"
+
+    # Blacklisted groups (doc)
+    if 'groups' in pending:
+        blacklist_value = not_loaded
+    elif blacklisted:
+        labels = []
+        for g in blacklisted[:3]:
+            section = checker.catalog.section(g['id'])
+            labels.append(f"{g['name']} ({section})" if section else g['name'])
+        blacklist_value = ", ".join(labels)
+        if len(blacklisted) > 3:
+            blacklist_value += f" (+{len(blacklisted) - 3} more)"
+    else:
+        blacklist_value = "No"
 
-        # Blacklisted groups (doc)
-        if blacklisted:
-            blacklist_value = ", ".join(g['name'] for g in blacklisted[:3])
-            if len(blacklisted) > 3:
-                blacklist_value += f" (+{len(blacklisted) - 3} more)"
-        else:
-            blacklist_value = "No"
+    # Entries found under a past username say so; "No" is only final once the history is loaded
+    past_names = {n.lower() for n in report.get('past_names') or []}
+    not_listed = "No (past usernames not loaded)" if 'names' in pending else "No"
 
-        # DHS database
-        if dhs_entry:
-            dhs_name = dhs_entry.get('username', username)
-            if dhs_entry.get('removed'):
-                dhs_value = f"ℹ️ **Previously blacklisted (removed) — {dhs_name}**\n{checker.format_entry(dhs_entry)}"
-            else:
-                dhs_value = f"⚠️ **Yes — {dhs_name}**\n{checker.format_entry(dhs_entry)}"
-        else:
-            dhs_value = "No"
+    def listed_as(entry: Dict) -> str:
+        name = entry.get('username', username)
+        return f"{name} (past username)" if name.lower() != username.lower() and name.lower() in past_names else name
 
-        # HoR database
-        if hor_entry:
-            hor_name  = hor_entry.get('username', username)
-            hor_value = f"⚠️ **Yes — {hor_name}**\n{checker.format_entry(hor_entry)}"
+    # DHS database
+    if dhs_entry:
+        dhs_name = listed_as(dhs_entry)
+        if dhs_entry.get('removed'):
+            dhs_value = f"ℹ️ **Previously blacklisted (removed) — {dhs_name}**\n{checker.format_entry(dhs_entry)}"
         else:
-            hor_value = "No"
+            dhs_value = f"⚠️ **Yes — {dhs_name}**\n{checker.format_entry(dhs_entry)}"
+    else:
+        dhs_value = not_listed
 
-        # Senate database
-        if senate_entry:
-            senate_name  = senate_entry.get('username', username)
-            senate_value = f"⚠️ **Yes — {senate_name}**\n{checker.format_entry(senate_entry)}"
-        else:
-            senate_value = "No"
+    # HoR database
+    if hor_entry:
+        hor_name  = listed_as(hor_entry)
+        hor_value = f"⚠️ **Yes — {hor_name}**\n{checker.format_entry(hor_entry)}"
+    else:
+        hor_value = not_listed
 
-        # Affiliations
+    # Senate database
+    if senate_entry:
+        senate_name  = listed_as(senate_entry)
+        senate_value = f"⚠️ **Yes — {senate_name}**\n{checker.format_entry(senate_entry)}"
+    else:
+        senate_value = not_listed
+
+    # Affiliations
+    if 'groups' in pending:
+        affil_value = not_loaded
+    elif 'groups' in report['unavailable']:
+        affil_value = unavailable
+    elif user_groups is None:
+        affil_value = "Not checked"
+    else:
         affil_value = f"{len(user_groups)} group(s)" if user_groups else "None"
 
-        # Friends ≥ 15
-        if friends_count is None:
-            friends_value = "Unknown"
-        elif friends_count >= 15:
-            friends_value = f"Yes ({friends_count})"
-        else:
-            friends_value = f"No ({friends_count})"
+    # Thresholds come from the guild's rules; None = rule disabled
+    min_friends = rules.minimum('friends')
+    min_age     = rules.minimum('account')
+    min_cusa    = rules.minimum('cusa')
+    min_badges  = rules.minimum('badges')
+
+    # Friends ≥ N
+    if min_friends is None:
+        friends_value = "Not checked"
+    elif 'friends' in pending:
+        friends_value = not_loaded
+    elif 'friends' in report['unavailable']:
+        friends_value = unavailable
+    elif friends_count is None:
+        friends_value = "Unknown"
+    elif friends_count >= min_friends:
+        friends_value = f"Yes ({friends_count})"
+    else:
+        friends_value = f"No ({friends_count})"
+
+    # Account age N+ months
+    if age_months is None:
+        age_value = "Unknown"
+    elif min_age is None:
+        age_value = f"{int(age_months)} months"
+    elif age_months >= min_age:
+        age_value = f"Yes ({int(age_months)} months)"
+    else:
+        age_value = f"No ({int(age_months)} months)"
+
+    # CUSA N+ months
+    if min_cusa is None:
+        cusa_value = "Not checked"
+    elif pending & {'groups', 'cusa'}:
+        cusa_value = not_loaded
+    elif not cusa_membership:
+        cusa_value = "Not a member"
+    elif cusa_months_in is None:
+        cusa_value = "Member (join date unavailable)"
+    elif cusa_months_in >= min_cusa:
+        cusa_value = f"Yes ({int(cusa_months_in)} months)"
+    else:
+        cusa_value = f"No ({int(cusa_months_in)} months)"
+
+    # Badges N+, with recent awards as an activity hint
+    badges = report.get('badges')
+    if min_badges is None:
+        badges_value = "Not checked"
+    elif 'badges' in pending:
+        badges_value = not_loaded
+    elif 'badges' in report['unavailable']:
+        badges_value = unavailable
+    elif badges is None:
+        badges_value = "Unknown"
+    else:
+        total  = f"{badges['count']}{'+' if badges['more'] else ''}"
+        answer = "Yes" if badges['count'] >= min_badges else "Unknown" if badges['more'] else "No"
+        badges_value = f"{answer} ({total}, {badges['recent']} in last {BADGE_RECENT_DAYS} days)"
+
+    # ── Factors & result ───────────────────────────────────────────────────────
+    factors      = report['factors']
+    hard_fail    = report['hard_fail']
+    result_value = "❌ Failed" if hard_fail else "✅ Passed"
+    if pending:
+        result_value += " (decided from local checks — full report not loaded)"
+    embed_color  = discord.Color.red() if hard_fail else discord.Color.green()
+
+    # ── Build embed ────────────────────────────────────────────────────────────
+    embed = discord.Embed(color=embed_color, timestamp=datetime.now())
+
+    embed.add_field(name="Agent",                value=agent,                                          inline=False)
+    embed.add_field(name="Target",               value=f"[{username}]({profile_url}) | `{user_id}`", inline=False)
+    embed.add_field(name="Suspicious Alts",      value=alts_value,                                     inline=False)
+    embed.add_field(name="Blacklisted (Groups)", value=blacklist_value,                                inline=False)
+    embed.add_field(name="Blacklisted (DHS)",    value=dhs_value,                                      inline=False)
+    embed.add_field(name="Blacklisted (HoR)",    value=hor_value,                                      inline=False)
+    embed.add_field(name="Blacklisted (Senate)", value=senate_value,                                   inline=False)
+    if rules.enabled('lookalike') and report.get('lookalikes'):
+        lookalike_value = "\n".join(f"• `{label}` ({SOURCE_LABELS[tag]}, {d} edit{'s' if d > 1 else ''})"
+                                     for label, _, tag, d in report['lookalikes'])
+        embed.add_field(name="Lookalike Names", value=lookalike_value,                                inline=False)
+    embed.add_field(name="Affiliations",         value=affil_value,                                    inline=False)
+    embed.add_field(name=f"Friends ≥ {15 if min_friends is None else min_friends:g}",   value=friends_value, inline=True)
+    embed.add_field(name=f"Account {6 if min_age is None else min_age:g}+ months",      value=age_value,     inline=True)
+    embed.add_field(name=f"In CUSA {3 if min_cusa is None else min_cusa:g}+ months",    value=cusa_value,    inline=True)
+    embed.add_field(name=f"Badges {10 if min_badges is None else min_badges:g}+",       value=badges_value,  inline=True)
+    embed.add_field(name="BGC Profile",          value=f"[View Profile]({profile_url})",               inline=False)
+
+    if factors:
+        embed.add_field(name="Factors", value="\n".join(f"• {f}" for f in factors), inline=False)
+
+    # Data served from an expired cache entry, or not fetched at all, during a Roblox outage
+    if report['stale'] or report['unavailable']:
+        lines = [f"• {FRESHNESS_LABELS[kind]}: cached <t:{int(ts)}:R>, refreshing" for kind, ts in report['stale'].items()]
+        lines += [f"• {FRESHNESS_LABELS[kind]}: unavailable" for kind in report['unavailable']]
+        embed.add_field(name="⚠️ Stale Data", value="\n".join(lines), inline=False)
+
+    embed.add_field(name="Result", value=result_value, inline=False)
+    embed.set_footer(text=f"Roblox ID: {user_id}" + (" · Cached verdict" if report['cached'] else ""))
+    return embed
+
+
+class FullReportView(discord.ui.View):
+    """'Load full report' button attached to fast-verdict results."""
+
+    def __init__(self, agent: str, user_info: Dict, rules: CompiledRules):
+        super().__init__(timeout=600)
+        self.agent     = agent
+        self.user_info = user_info
+        self.rules     = rules
+
+    @discord.ui.button(label="Load full report", style=discord.ButtonStyle.secondary)
+    async def load_full(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await interaction.response.defer()
+        schedule_lookups(interaction)
+        started = time.perf_counter()
+        try:
+            report = await run_blocking(checker.risk_profile, self.user_info, self.rules)
+            embed  = build_report_embed(self.agent, self.user_info, report, self.rules)
+            await interaction.edit_original_response(embed=embed, view=None)
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            await run_blocking(lambda: history.record(report, interaction.user.id, interaction.guild_id,
+                                                      complete=True, elapsed_ms=elapsed_ms))
+            await run_blocking(checker.graph.save)
+        except Exception as e:
+            await interaction.followup.send(f"❌ An error occurred: {str(e)}", ephemeral=True)
+            print(f"Error loading full report: {e}")
+        self.stop()
 
-        # Account age 6+ months
-        if age_months is None:
-            age_value = "Unknown"
-        elif age_months >= 6:
-            age_value = f"Yes ({int(age_months)} months)"
-        else:
-            age_value = f"No ({int(age_months)} months)"
-
-        # CUSA 3+ months
-        if not cusa_membership:
-            cusa_value = "Not a member"
-        elif cusa_months_in is None:
-            cusa_value = "Member (join date unavailable)"
-        elif cusa_months_in >= 3:
-            cusa_value = f"Yes ({int(cusa_months_in)} months)"
-        else:
-            cusa_value = f"No ({int(cusa_months_in)} months)"
 
-        # ── Factors & result ───────────────────────────────────────────────────
-        factors = []
+AUTOCOMPLETE_TAGS = {
+    'dhs':    " · DHS blacklist",
+    'hor':    " · HoR blacklist",
+    'senate': " · Senate blacklist",
+}
 
-        if similar_users:
-            factors.append(f"Suspicious alts detected ({len(similar_users)})")
-        if blacklisted:
-            factors.append(f"In {len(blacklisted)} blacklisted group(s)")
-        if dhs_entry:
-            if dhs_entry.get('removed'):
-                factors.append("Previously in DHS Database (removed)")
-            else:
-                factors.append("Found in DHS Database")
-        if hor_entry:
-            factors.append(f"Found in HoR Database")
-        if senate_entry:
-            factors.append(f"Found in Senate Database")
-        if friends_count is not None and friends_count < 15:
-            factors.append(f"Low friend count ({friends_count})")
-        if age_months is not None and age_months < 6:
-            factors.append(f"Account under 6 months ({int(age_months)} months old)")
-        if cusa_membership and cusa_months_in is not None and cusa_months_in < 3:
-            factors.append(f"In CUSA less than 3 months ({int(cusa_months_in)} months)")
-
-        dhs_active   = dhs_entry and not dhs_entry.get('removed')
-        hard_fail    = bool(blacklisted or dhs_active or hor_entry or senate_entry) or \
-                       (friends_count is not None and friends_count < 15) or \
-                       (age_months is not None and age_months < 6)
-        result_value = "❌ Failed" if hard_fail else "✅ Passed"
-        embed_color  = discord.Color.red() if hard_fail else discord.Color.green()
-
-        # ── Build embed ────────────────────────────────────────────────────────
-        embed = discord.Embed(color=embed_color, timestamp=datetime.now())
-
-        embed.add_field(name="Agent",                value=interaction.user.mention,                      inline=False)
-        embed.add_field(name="Target",               value=f"[{username}]({profile_url}) | `{user_id}`", inline=False)
-        embed.add_field(name="Suspicious Alts",      value=alts_value,                                     inline=False)
-        embed.add_field(name="Blacklisted (Groups)", value=blacklist_value,                                inline=False)
-        embed.add_field(name="Blacklisted (DHS)",    value=dhs_value,                                      inline=False)
-        embed.add_field(name="Blacklisted (HoR)",    value=hor_value,                                      inline=False)
-        embed.add_field(name="Blacklisted (Senate)", value=senate_value,                                   inline=False)
-        embed.add_field(name="Affiliations",         value=affil_value,                                    inline=False)
-        embed.add_field(name="Friends ≥ 15",         value=friends_value,                                  inline=True)
-        embed.add_field(name="Account 6+ months",    value=age_value,                                      inline=True)
-        embed.add_field(name="In CUSA 3+ months",    value=cusa_value,                                     inline=True)
-        embed.add_field(name="BGC Profile",          value=f"[View Profile]({profile_url})",               inline=False)
-
-        if factors:
-            embed.add_field(name="Factors", value="\n".join(f"• {f}" for f in factors), inline=False)
-
-        embed.add_field(name="Result", value=result_value, inline=False)
-        embed.set_footer(text=f"Roblox ID: {user_id}")
 
-        await interaction.followup.send(embed=embed)
+async def target_autocomplete(interaction: discord.Interaction, current: str) -> List[app_commands.Choice[str]]:
+    """Known users whose name starts with what's typed — local index only, no Roblox requests."""
+    # The choice's value is the numeric ID, so the command skips name resolution
+    return [
+        app_commands.Choice(name=f"{label} · {uid}{AUTOCOMPLETE_TAGS.get(tag, '')}"[:100], value=str(uid))
+        for label, uid, tag in checker.name_index.search(current)
+    ]
+
+
+@bot.tree.command(name="background-check", description="Run a full background check on a Roblox user")
+@app_commands.describe(
+    user="Roblox user ID, username, or display name",
+    full="Load every field even when the blacklist checks already decide the result"
+)
+@app_commands.autocomplete(user=target_autocomplete)
+async def background_check(interaction: discord.Interaction, user: str, full: bool = False):
+    await interaction.response.defer()
+    schedule_lookups(interaction)
+    started = time.perf_counter()
+
+    try:
+        # ── Resolve the user ───────────────────────────────────────────────────
+        user_info = await run_blocking(checker.resolve_user, user)
+        if not user_info or user_info.get('errors'):
+            await interaction.followup.send(f"❌ Could not find a Roblox user matching `{user}`.")
+            return
+
+        rules = guild_rules.for_guild(interaction.guild_id)
+        agent = interaction.user.mention
+
+        # ── Fast verdict ───────────────────────────────────────────────────────
+        # Blacklist and account-age checks need nothing beyond the user info
+        # already fetched. More data can only add failures, so a failure here
+        # is final and the network-backed fields load on demand.
+        if not full:
+            quick = await run_blocking(lambda: checker.risk_profile(user_info, rules, needs=frozenset()))
+            if quick['hard_fail']:
+                embed = build_report_embed(agent, user_info, quick, rules)
+                await interaction.followup.send(embed=embed, view=FullReportView(agent, user_info, rules))
+                elapsed_ms = (time.perf_counter() - started) * 1000
+                await run_blocking(lambda: history.record(quick, interaction.user.id, interaction.guild_id,
+                                                          complete=False, elapsed_ms=elapsed_ms))
+                return
+
+        report = await run_blocking(checker.risk_profile, user_info, rules)
+        await interaction.followup.send(embed=build_report_embed(agent, user_info, report, rules))
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        await run_blocking(lambda: history.record(report, interaction.user.id, interaction.guild_id,
+                                                  complete=True, elapsed_ms=elapsed_ms))
+        await run_blocking(checker.graph.save)
 
     except Exception as e:
         await interaction.followup.send(f"❌ An error occurred: {str(e)}")
         print(f"Error in background check: {e}")
 
 
+def friend_hits(name: str, user_id: int, group_ids: List[int], past_names: List[str] = ()) -> List[str]:
+    """Blacklist hits for one friend from their stored group IDs and past usernames — no Roblox requests."""
+    hits = []
+    past = checker.past_name_hits(past_names)
+
+    # Blacklisted groups
+    bl_groups = [gid for gid in group_ids if str(gid) in checker.blacklisted_groups]
+    if bl_groups:
+        hits.append(f"Blacklisted group(s): {', '.join(checker.catalog.name(gid) for gid in bl_groups[:2])}")
+
+    # DHS
+    dhs = checker.check_dhs(name, user_id)
+    if dhs:
+        if dhs.get('removed'):
+            hits.append("DHS Database (removed)")
+        else:
+            hits.append("DHS Database")
+    elif 'dhs' in past:
+        hits.append(f"DHS Database (as `{past['dhs'].get('username')}`)")
+
+    # HoR
+    if checker.check_hor(name, user_id):
+        hits.append("HoR Database")
+    elif 'hor' in past:
+        hits.append(f"HoR Database (as `{past['hor'].get('username')}`)")
+
+    # Senate
+    if checker.check_senate(name, user_id):
+        hits.append("Senate Database")
+    elif 'senate' in past:
+        hits.append(f"Senate Database (as `{past['senate'].get('username')}`)")
+
+    # Lookalike of a blacklisted username
+    if not hits:
+        for label, _, tag, _ in checker.lookalikes(name, user_id)[:1]:
+            hits.append(f"Name close to `{label}` ({SOURCE_LABELS[tag]})")
+
+    return hits
+
+
+class FriendCheckView(discord.ui.View):
+    """
+    Page buttons and a CSV export for a /friend-check result. Each page is
+    rendered from the scan's flagged list when it's opened and always fits
+    Discord's embed limits, however many friends were flagged.
+    """
+
+    def __init__(self, summary: Dict, flagged: List[Dict]):
+        super().__init__(timeout=900)
+        self.summary = summary
+        self.flagged = flagged
+        self.page    = 0
+        self.pages   = max(1, -(-len(flagged) // FRIEND_CHECK_PAGE_SIZE))
+        self._sync_buttons()
+
+    @staticmethod
+    def _line(f: Dict) -> str:
+        head = f"**[{f['name']}]({f['profile']})** — "
+        hits = ", ".join(f['hits'])
+        room = FRIEND_CHECK_LINE_LIMIT - len(head)
+        return head + (hits if len(hits) <= room else hits[:max(room - 1, 0)] + "…")
+
+    def render(self) -> discord.Embed:
+        s       = self.summary
+        flagged = self.flagged
+        embed   = discord.Embed(
+            title=f"Friend Check — {s['username']}",
+            color=discord.Color.red() if flagged else discord.Color.green(),
+            timestamp=datetime.now()
+        )
+        embed.add_field(name="Agent",           value=s['agent'],                                           inline=False)
+        embed.add_field(name="Target",          value=f"[{s['username']}]({s['profile_url']}) | `{s['user_id']}`", inline=False)
+        embed.add_field(name="Friends Scanned", value=str(s['total']),                                      inline=True)
+        embed.add_field(name="Flagged",         value=str(len(flagged)),                                    inline=True)
+
+        if flagged:
+            start = self.page * FRIEND_CHECK_PAGE_SIZE
+            lines = [self._line(f) for f in flagged[start:start + FRIEND_CHECK_PAGE_SIZE]]
+            embed.description = f"**Flagged Friends** ({start + 1}–{start + len(lines)} of {len(flagged)})\n" + "\n".join(lines)
+        else:
+            embed.add_field(name="Flagged Friends", value="None found ✅", inline=False)
+
+        missing = []
+        if s['no_groups']:
+            missing.append(f"Groups for {s['no_groups']} friend(s) couldn't be fetched — Roblox not responding.")
+        if s['counts']['no_names']:
+            missing.append(f"Past usernames for {s['counts']['no_names']} friend(s) couldn't be fetched — "
+                           f"they'll be checked on the next scan.")
+        if missing:
+            embed.add_field(name="⚠️ Incomplete", value="\n".join(missing), inline=False)
+        page = f" · Page {self.page + 1}/{self.pages}" if self.pages > 1 else ""
+        embed.set_footer(text=f"Roblox ID: {s['user_id']} · {s['counts']['fetched']} new, "
+                              f"{s['counts']['reused']} from last scan{page}")
+        return embed
+
+    def _sync_buttons(self):
+        self.previous_page.disabled = self.page == 0
+        self.next_page.disabled     = self.page >= self.pages - 1
+
+    async def _show(self, interaction: discord.Interaction, page: int):
+        self.page = min(max(page, 0), self.pages - 1)
+        self._sync_buttons()
+        await interaction.response.edit_message(embed=self.render(), view=self)
+
+    @discord.ui.button(label="◀ Previous", style=discord.ButtonStyle.secondary)
+    async def previous_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self._show(interaction, self.page - 1)
+
+    @discord.ui.button(label="Next ▶", style=discord.ButtonStyle.secondary)
+    async def next_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self._show(interaction, self.page + 1)
+
+    @discord.ui.button(label="Export CSV", style=discord.ButtonStyle.primary)
+    async def export(self, interaction: discord.Interaction, button: discord.ui.Button):
+        out = io.StringIO()
+        writer = csv.writer(out)
+        writer.writerow(['roblox_id', 'username', 'hits'])
+        for f in self.flagged:
+            writer.writerow([f['id'], f['name'], "; ".join(f['hits'])])
+        data = io.BytesIO(out.getvalue().encode('utf-8'))
+        await interaction.response.send_message(
+            f"📄 {len(self.flagged)} flagged friend(s) of **{self.summary['username']}**",
+            file=discord.File(data, filename=f"friend_check_{self.summary['user_id']}.csv")
+        )
+
+
 @bot.tree.command(name="friend-check", description="Scan a user's friends list against all blacklist databases")
 @app_commands.describe(user="Roblox user ID, username, or display name")
+@app_commands.autocomplete(user=target_autocomplete)
 async def friend_check(interaction: discord.Interaction, user: str):
     await interaction.response.defer()
+    schedule_lookups(interaction, PRIORITY_BATCH)
 
     try:
         # ── Resolve the user ───────────────────────────────────────────────────
-        user_info = checker.resolve_user(user)
+        user_info = await run_blocking(checker.resolve_user, user, False)
         if not user_info or user_info.get('errors'):
             await interaction.followup.send(f"❌ Could not find a Roblox user matching `{user}`.")
             return
@@ -704,9 +3891,10 @@ async def friend_check(interaction: discord.Interaction, user: str):
         username    = user_info.get('name', 'Unknown')
         user_id     = user_info.get('id')
         profile_url = ROBLOX_PROFILE_URL.format(user_id)
+        checker.graph.set_name(user_id, username)
 
         # ── Fetch friends ──────────────────────────────────────────────────────
-        friends = checker.get_friends(user_id)
+        friends = await run_blocking(checker.get_friends, user_id)
         if friends is None:
             await interaction.followup.send("❌ Could not fetch friends list.")
             return
@@ -715,149 +3903,1127 @@ async def friend_check(interaction: discord.Interaction, user: str):
             return
 
         # ── Check each friend against all databases ────────────────────────────
-        flagged = []
-
-        for friend in friends:
-            fid      = friend.get('id')
-            fname    = friend.get('name', '').strip()
-            # Fallback: if name missing, fetch directly
-            if not fname:
-                finfo = checker.get_user_info(fid)
-                fname = finfo.get('name', str(fid)) if finfo else str(fid)
-            fprofile = ROBLOX_PROFILE_URL.format(fid)
-            hits     = []
-
-            # Blacklisted groups
-            fgroups = checker.get_user_groups(fid) or []
-            bl_groups = checker.check_blacklisted_groups(fgroups)
-            if bl_groups:
-                hits.append(f"Blacklisted group(s): {', '.join(g['name'] for g in bl_groups[:2])}")
-
-            # DHS
-            fdhs = checker.check_dhs(fname, fid)
-            if fdhs:
-                if fdhs.get('removed'):
-                    hits.append("DHS Database (removed)")
+        # Friends from the last scan reuse their stored group IDs; their hits
+        # are only recomputed (locally) if the blacklists changed since.
+        # Compared by content digest: generations restart at 0 with every process
+        previous = await run_blocking(friend_scans.get, user_id) or {'friends': {}}
+        digest   = checker.blacklist_digest
+
+        def scan_friends() -> tuple:
+            now     = time.time()
+            record  = {'digest': digest, 'scanned_at': now, 'friends': {}}
+            flagged = []
+            counts  = {'fetched': 0, 'reused': 0, 'no_groups': 0, 'no_names': 0}
+            for friend in friends:
+                fid   = friend.get('id')
+                fname = friend.get('name', '').strip()
+                known = previous['friends'].get(str(fid))
+                # Fallback: if name missing, use the last scan's or fetch directly
+                if not fname:
+                    fname = known['name'] if known else ''
+                if not fname:
+                    finfo = checker.get_user_info(fid)
+                    fname = finfo.get('name', str(fid)) if finfo else str(fid)
+
+                # Records stored before past usernames were checked lack them and are refetched
+                if known and 'past_names' in known and now - known['checked_at'] < FRIEND_SCAN_MAX_AGE:
+                    counts['reused'] += 1
+                    entry = known
+                    if digest is None or previous.get('digest') != digest:
+                        entry = {**known, 'hits': friend_hits(fname, fid, known['group_ids'], known['past_names'])}
+                    record['friends'][str(fid)] = entry
                 else:
-                    hits.append("DHS Database")
-
-            # HoR
-            if checker.check_hor(fname, fid):
-                hits.append("HoR Database")
-
-            # Senate
-            if checker.check_senate(fname, fid):
-                hits.append("Senate Database")
-
-            if hits:
-                flagged.append({
-                    'name':    fname,
-                    'id':      fid,
-                    'profile': fprofile,
-                    'hits':    hits,
-                })
+                    # Username history loads while the groups do
+                    names_job  = checker.side_lookup(checker.get_username_history, fid)
+                    fgroups    = checker.get_user_groups(fid)
+                    group_ids  = [int(g['id']) for g in fgroups or []]
+                    past_names = names_job.result()
+                    entry      = {'name': fname, 'group_ids': group_ids, 'past_names': past_names or [],
+                                  'checked_at': now, 'hits': friend_hits(fname, fid, group_ids, past_names or [])}
+                    # Friends whose groups or past usernames couldn't be fetched aren't stored, so the next scan retries them
+                    if fgroups is None:
+                        counts['no_groups'] += 1
+                    elif past_names is None:
+                        counts['no_names'] += 1
+                    else:
+                        counts['fetched'] += 1
+                        record['friends'][str(fid)] = entry
+
+                if entry['hits']:
+                    flagged.append({
+                        'name':    fname,
+                        'id':      fid,
+                        'profile': ROBLOX_PROFILE_URL.format(fid),
+                        'hits':    entry['hits'],
+                    })
+            return flagged, counts, record
+
+        # Batch priority — single checks from other moderators go first
+        flagged, counts, record = await run_blocking(scan_friends)
+        no_groups = counts['no_groups']
+        await run_blocking(friend_scans.store, user_id, record)
+
+        # ── Reply ──────────────────────────────────────────────────────────────
+        # Only the first page is rendered now; the view renders the others as they're opened
+        view = FriendCheckView({
+            'agent':       interaction.user.mention,
+            'username':    username,
+            'user_id':     user_id,
+            'profile_url': profile_url,
+            'total':       len(friends),
+            'no_groups':   no_groups,
+            'counts':      counts,
+        }, flagged)
+        if flagged:
+            await interaction.followup.send(embed=view.render(), view=view)
+        else:
+            await interaction.followup.send(embed=view.render())
+        await run_blocking(checker.graph.save)
+
+    except Exception as e:
+        await interaction.followup.send(f"❌ An error occurred: {str(e)}")
+        print(f"Error in friend check: {e}")
+
+
+# ── Network scan ───────────────────────────────────────────────────────────────
+async def crawl_friend_network(target_id: int, depth: int = 2,
+                               max_requests: int = NETWORK_SCAN_MAX_REQUESTS,
+                               budget: float = NETWORK_SCAN_BUDGET) -> Dict:
+    """
+    Breadth-first crawl of the friend graph out to `depth` hops.
+
+    Each node is expanded at most once however many friends lead to it, and
+    only uncached friend lists count towards `max_requests`. Every node
+    tracks how many shortest paths from the target reach it and how many of
+    those pass through a blacklisted user; nodes two or more hops out are
+    ranked by the latter. Whatever has been collected when `budget` runs
+    out is returned.
+    """
+    started  = time.monotonic()
+    deadline = started + budget
+    # Fetches still queued when the budget runs out are dropped, not sent
+    narrow_lookup_deadline(deadline)
+
+    level    = {target_id: 0}   # uid -> hop distance, doubles as the visited set
+    names    = {}
+    paths    = {target_id: 1}   # shortest paths from the target
+    bl_paths = {target_id: 0}   # ... of which pass through a blacklisted user
+    flagged  = {}               # uid -> local blacklist hits
+    requests_made = 0
+    truncated     = False
+    frontier      = [target_id]
+    # Cancelling a task doesn't stop its pool job; jobs not yet started see this and skip the fetch
+    abandoned     = threading.Event()
+
+    def fetch_friends(uid: int) -> Optional[List]:
+        if abandoned.is_set():
+            return None
+        return checker.get_friends(uid)
+
+    for d in range(1, depth + 1):
+        if not frontier:
+            break
+
+        # Expand blacklisted users first so a capped scan still follows the likeliest rings
+        frontier.sort(key=lambda uid: uid not in flagged)
+        # Behind a sidecar the cache is a network call, so it's read off the event loop
+        cached   = await run_blocking(lambda: {uid for uid in frontier if checker.cache.get(('friends', uid)) is not None})
+        to_fetch = []
+        for uid in frontier:
+            if uid not in cached:
+                if requests_made >= max_requests:
+                    truncated = True
+                    continue
+                requests_made += 1
+            to_fetch.append(uid)
+
+        remaining = deadline - time.monotonic()
+        if remaining <= 0 or not to_fetch:
+            truncated = truncated or remaining <= 0
+            break
+
+        pending = {uid: asyncio.ensure_future(run_blocking(fetch_friends, uid)) for uid in to_fetch}
+        _, late = await asyncio.wait(pending.values(), timeout=remaining)
+        if late:
+            abandoned.set()
+        for task in late:
+            task.cancel()
+            truncated = True
+
+        next_frontier = []
+        for uid in to_fetch:
+            task = pending[uid]
+            if task in late or task.exception() is not None or not task.result():
+                continue
+            for friend in task.result():
+                fid = friend.get('id')
+                if not fid:
+                    continue
+                if fid not in level:
+                    level[fid]    = d
+                    names[fid]    = friend.get('name', '') or str(fid)
+                    paths[fid]    = 0
+                    bl_paths[fid] = 0
+                    hits = checker.local_hits(names[fid], fid)
+                    if hits:
+                        flagged[fid] = hits
+                    next_frontier.append(fid)
+                if level[fid] == d:
+                    paths[fid]    += paths[uid]
+                    bl_paths[fid] += paths[uid] if fid in flagged else bl_paths[uid]
+        frontier = next_frontier
+
+    ranked = sorted(
+        (uid for uid, d in level.items() if d >= 2 and bl_paths[uid]),
+        key=lambda uid: (-bl_paths[uid], uid not in flagged, -paths[uid])
+    )
+    return {
+        'ranked': [
+            {
+                'id':       uid,
+                'name':     names[uid],
+                'depth':    level[uid],
+                'score':    bl_paths[uid],
+                'paths':    paths[uid],
+                'hits':     flagged.get(uid, []),
+            }
+            for uid in ranked
+        ],
+        'first_degree_flagged': [uid for uid in flagged if level[uid] == 1],
+        'names':     names,
+        'visited':   len(level) - 1,
+        'requests':  requests_made,
+        'elapsed':   time.monotonic() - started,
+        'truncated': truncated,
+    }
+
+
+@bot.tree.command(name="network-scan", description="Scan a user's friends-of-friends for blacklisted connections")
+@app_commands.describe(
+    user="Roblox user ID, username, or display name",
+    depth=f"How many hops to crawl (2–{NETWORK_SCAN_MAX_DEPTH}, default 2)"
+)
+@app_commands.autocomplete(user=target_autocomplete)
+async def network_scan(interaction: discord.Interaction, user: str, depth: int = 2):
+    await interaction.response.defer()
+    schedule_lookups(interaction, PRIORITY_BATCH)
+
+    try:
+        user_info = await run_blocking(checker.resolve_user, user, False)
+        if not user_info or user_info.get('errors'):
+            await interaction.followup.send(f"❌ Could not find a Roblox user matching `{user}`.")
+            return
+
+        username    = user_info.get('name', 'Unknown')
+        user_id     = user_info.get('id')
+        profile_url = ROBLOX_PROFILE_URL.format(user_id)
+        depth       = max(2, min(depth, NETWORK_SCAN_MAX_DEPTH))
+
+        scan   = await crawl_friend_network(user_id, depth)
+        ranked = scan['ranked']
 
-        # ── Build embed ────────────────────────────────────────────────────────
-        total     = len(friends)
-        embed_color = discord.Color.red() if flagged else discord.Color.green()
         embed = discord.Embed(
-            title=f"Friend Check — {username}",
-            color=embed_color,
+            title=f"Network Scan — {username}",
+            color=discord.Color.red() if ranked else discord.Color.green(),
             timestamp=datetime.now()
         )
-
-        embed.add_field(
-            name="Agent",
-            value=interaction.user.mention,
-            inline=False
-        )
-        embed.add_field(
-            name="Target",
-            value=f"[{username}]({profile_url}) | `{user_id}`",
-            inline=False
-        )
-        embed.add_field(
-            name="Friends Scanned",
-            value=str(total),
-            inline=True
-        )
-        embed.add_field(
-            name="Flagged",
-            value=str(len(flagged)),
-            inline=True
-        )
-
-        if flagged:
-            # Split into chunks to avoid hitting Discord's 1024 char field limit
-            chunk      = []
-            chunk_num  = 1
-            chunk_len  = 0
-
-            for f in flagged:
-                line = f"**[{f['name']}]({f['profile']})** — {', '.join(f['hits'])}\n"
-                if chunk_len + len(line) > 950:
-                    embed.add_field(
-                        name=f"Flagged Friends ({chunk_num})",
-                        value="".join(chunk),
-                        inline=False
-                    )
-                    chunk     = []
-                    chunk_len = 0
-                    chunk_num += 1
-                chunk.append(line)
-                chunk_len += len(line)
-
-            if chunk:
-                embed.add_field(
-                    name=f"Flagged Friends{f' ({chunk_num})' if chunk_num > 1 else ''}",
-                    value="".join(chunk),
-                    inline=False
-                )
+        embed.add_field(name="Agent",  value=interaction.user.mention,                      inline=False)
+        embed.add_field(name="Target", value=f"[{username}]({profile_url}) | `{user_id}`", inline=False)
+        embed.add_field(name="Users Reached", value=str(scan['visited']),        inline=True)
+        embed.add_field(name="Requests",      value=str(scan['requests']),       inline=True)
+        embed.add_field(name="Time",          value=f"{scan['elapsed']:.1f}s",   inline=True)
+
+        bridges = scan['first_degree_flagged']
+        if bridges:
+            value = ", ".join(
+                f"[{scan['names'][uid]}]({ROBLOX_PROFILE_URL.format(uid)})" for uid in bridges[:10]
+            )
+            if len(bridges) > 10:
+                value += f" (+{len(bridges) - 10} more)"
+            embed.add_field(name=f"Blacklisted Friends ({len(bridges)})", value=value, inline=False)
+
+        if ranked:
+            lines = []
+            for r in ranked[:15]:
+                line = (f"**[{r['name']}]({ROBLOX_PROFILE_URL.format(r['id'])})** — "
+                        f"{r['score']} blacklisted path(s), {r['depth']} hops")
+                if r['hits']:
+                    line += f" · {', '.join(r['hits'])}"
+                lines.append(line)
+            value = "\n".join(lines)
+            if len(ranked) > 15:
+                value += f"\n(+{len(ranked) - 15} more)"
+            embed.add_field(name="Risky Connections", value=value[:1024], inline=False)
         else:
+            embed.add_field(name="Risky Connections", value="None found ✅", inline=False)
+
+        if scan['truncated']:
             embed.add_field(
-                name="Flagged Friends",
-                value="None found ✅",
+                name="Partial Scan",
+                value="Request or time budget reached — blacklisted friends were expanded first.",
                 inline=False
             )
 
         embed.set_footer(text=f"Roblox ID: {user_id}")
         await interaction.followup.send(embed=embed)
+        await run_blocking(checker.graph.save)
 
     except Exception as e:
         await interaction.followup.send(f"❌ An error occurred: {str(e)}")
-        print(f"Error in friend check: {e}")
+        print(f"Error in network scan: {e}")
 
 
+@bot.tree.command(name="watch-add", description="Add a Roblox user to the background re-check watchlist")
+@app_commands.describe(user="Roblox user ID, username, or display name")
+@app_commands.autocomplete(user=target_autocomplete)
+async def watch_add(interaction: discord.Interaction, user: str):
+    await interaction.response.defer()
+    schedule_lookups(interaction)
+
+    user_info = await run_blocking(checker.resolve_user, user, False)
+    if not user_info or user_info.get('errors'):
+        await interaction.followup.send(f"❌ Could not find a Roblox user matching `{user}`.")
+        return
+
+    username = user_info.get('name', 'Unknown')
+    user_id  = user_info.get('id')
+    added    = watchlist.add(
+        user_id, username,
+        guild_id=interaction.guild_id,
+        channel_id=interaction.channel_id,
+        added_by=interaction.user.id,
+    )
+    if added:
+        await interaction.followup.send(f"👁️ Now watching **{username}** (`{user_id}`). Alerts fire if they start failing.")
+    else:
+        await interaction.followup.send(f"**{username}** (`{user_id}`) is already on the watchlist.")
+
+
+@bot.tree.command(name="watch-remove", description="Remove a Roblox user from the watchlist")
+@app_commands.describe(user="Roblox user ID, username, or display name")
+@app_commands.autocomplete(user=target_autocomplete)
+async def watch_remove(interaction: discord.Interaction, user: str):
+    await interaction.response.defer()
+    schedule_lookups(interaction)
+
+    user_info = await run_blocking(checker.resolve_user, user, False)
+    if not user_info or user_info.get('errors'):
+        await interaction.followup.send(f"❌ Could not find a Roblox user matching `{user}`.")
+        return
+
+    username = user_info.get('name', 'Unknown')
+    user_id  = user_info.get('id')
+    if watchlist.remove(user_id):
+        await interaction.followup.send(f"Removed **{username}** (`{user_id}`) from the watchlist.")
+    else:
+        await interaction.followup.send(f"**{username}** (`{user_id}`) is not on the watchlist.")
+
+
+@bot.tree.command(name="watchlist", description="Show watched users and their last sweep result")
+async def show_watchlist(interaction: discord.Interaction):
+    watchlist.refresh()
+    members = watchlist.members
+    if not members:
+        await interaction.response.send_message("The watchlist is empty.")
+        return
+
+    status = {True: "✅", False: "❌", None: "⏳"}
+    lines  = [
+        f"{status[m.get('passed')]} [{m.get('username', key)}]({ROBLOX_PROFILE_URL.format(key)}) | `{key}`"
+        for key, m in list(members.items())[:25]
+    ]
+    if len(members) > 25:
+        lines.append(f"(+{len(members) - 25} more)")
+
+    embed = discord.Embed(title=f"Watchlist ({len(members)})", description="\n".join(lines),
+                          color=discord.Color.blurple())
+    await interaction.response.send_message(embed=embed)
+
+
+# ── Rules ──────────────────────────────────────────────────────────────────────
+RULE_LABELS = {
+    'alts':      "Suspicious alts",
+    'groups':    "Blacklisted groups",
+    'dhs':       "DHS Database",
+    'hor':       "HoR Database",
+    'senate':    "Senate Database",
+    'friends':   "Minimum friends",
+    'account':   "Minimum account age (months)",
+    'cusa':      "Minimum CUSA tenure (months)",
+    'lookalike': "Lookalike blacklisted usernames",
+    'badges':    "Minimum badges",
+}
+
+
+def format_rules(rules: CompiledRules) -> str:
+    lines = []
+    for name, rule in rules.config.items():
+        if not rule.get('enabled', True):
+            state = "⚪ Off"
+        elif rule.get('fail'):
+            state = "🔴 Fails check"
+        else:
+            state = "🟡 Factor only"
+        minimum = f" — {rule['min']:g}" if 'min' in rule else ""
+        lines.append(f"{state} · **{RULE_LABELS[name]}**{minimum}")
+    return "\n".join(lines)
+
+
+async def rescore_members(keys: List[str], queue_missing: bool = True) -> tuple:
+    """
+    Re-apply each guild's rules to watched members from the checker's
+    column store, in one vectorized pass per guild. Members without stored
+    inputs for the rules are queued for the sweeper if `queue_missing`.
+    """
+    by_guild = {}
+    for key in keys:
+        if key in watchlist.members:
+            by_guild.setdefault(watchlist.members[key].get('guild_id'), []).append(int(key))
+
+    rescored, queued = 0, 0
+    for guild_id, user_ids in by_guild.items():
+        rules = guild_rules.for_guild(guild_id)
+        verdicts, missing = checker.columns.score(rules, user_ids, checker.blacklist_generation)
+        for user_id, hard_fail, factors in verdicts:
+            key, member = str(user_id), watchlist.members.get(str(user_id))
+            if member is None:
+                continue   # removed while an earlier alert was being sent
+            if watchlist.set_verdict(key, not hard_fail, factors):
+                await send_watch_alert(key, member, {'username': member['username'], 'factors': factors})
+        if queue_missing:
+            missing = [uid for uid in missing if str(uid) in watchlist.members]
+            for user_id in missing:
+                watchlist.mark_dirty(str(user_id))
+            queued += len(missing)
+        rescored += len(verdicts)
+    watchlist.save()
+    return rescored, queued
+
+
+async def rescore_watchlist(guild_id: int) -> tuple:
+    """Re-apply a guild's rules to its watched members; see rescore_members."""
+    watchlist.refresh()
+    return await rescore_members([k for k, m in watchlist.members.items() if m.get('guild_id') == guild_id])
+
+
+@bot.tree.command(name="rules", description="Show this server's background check pass/fail rules")
+async def show_rules(interaction: discord.Interaction):
+    rules = guild_rules.for_guild(interaction.guild_id)
+    embed = discord.Embed(title="Background Check Rules", description=format_rules(rules),
+                          color=discord.Color.blurple())
+    await interaction.response.send_message(embed=embed)
+
+
+@bot.tree.command(name="rules-set", description="Change one of this server's background check rules")
+@app_commands.describe(
+    rule="Which rule to change",
+    enabled="Turn the rule on or off (off also skips fetching its data)",
+    fails_check="Whether a hit fails the check, or is only listed as a factor",
+    minimum="Threshold for friends / account age / CUSA tenure / badges rules",
+    reset="Restore every rule to the defaults"
+)
+@app_commands.choices(rule=[app_commands.Choice(name=label, value=name) for name, label in RULE_LABELS.items()])
+@app_commands.default_permissions(manage_guild=True)
+async def set_rule(interaction: discord.Interaction, rule: Optional[str] = None,
+                   enabled: Optional[bool] = None, fails_check: Optional[bool] = None,
+                   minimum: Optional[float] = None, reset: bool = False):
+    if interaction.guild_id is None:
+        await interaction.response.send_message("Rules can only be changed inside a server.")
+        return
+
+    if not reset:
+        if rule is None:
+            await interaction.response.send_message("Pick a `rule` to change, or set `reset` to restore the defaults.")
+            return
+        if minimum is not None and 'min' not in DEFAULT_RULES[rule]:
+            await interaction.response.send_message(f"**{RULE_LABELS[rule]}** has no minimum to set.")
+            return
+        if minimum is not None and minimum < 0:
+            await interaction.response.send_message("A minimum can't be negative.")
+            return
 
+    # Saving takes the rules file lock, which another worker may be holding
+    await interaction.response.defer()
+    if reset:
+        rules = await run_blocking(guild_rules.reset, interaction.guild_id)
+    else:
+        rules = await run_blocking(lambda: guild_rules.update(
+            interaction.guild_id, rule, enabled=enabled, fail=fails_check, min=minimum))
+    rescored, queued = await rescore_watchlist(interaction.guild_id)
+
+    embed = discord.Embed(title="Background Check Rules Updated", description=format_rules(rules),
+                          color=discord.Color.blurple())
+    if rescored or queued:
+        embed.set_footer(text=f"Watchlist: {rescored} re-scored from cache, {queued} queued for re-check")
+    await interaction.followup.send(embed=embed)
+
+
+@bot.tree.command(name="who-knows", description="Show checked users who are friends with, or share a blacklisted group with, a user")
+@app_commands.describe(user="Roblox user ID, username, or display name")
+@app_commands.autocomplete(user=target_autocomplete)
+async def who_knows(interaction: discord.Interaction, user: str):
+    await interaction.response.defer()
+    schedule_lookups(interaction)
+
+    user_info = await run_blocking(checker.resolve_user, user, False)
+    if not user_info or user_info.get('errors'):
+        await interaction.followup.send(f"❌ Could not find a Roblox user matching `{user}`.")
+        return
+
+    username    = user_info.get('name', 'Unknown')
+    user_id     = user_info.get('id')
+    profile_url = ROBLOX_PROFILE_URL.format(user_id)
+    graph       = checker.graph
+    await run_blocking(graph.refresh)   # edges other workers recorded
+
+    def link(uid: int) -> str:
+        return f"[{graph.names.get(uid, uid)}]({ROBLOX_PROFILE_URL.format(uid)})"
+
+    def join_links(ids: List[int], limit: int = 15) -> str:
+        value = ", ".join(link(uid) for uid in ids[:limit])
+        if len(ids) > limit:
+            value += f" (+{len(ids) - limit} more)"
+        return value
+
+    # Everything below comes from the local index — no Roblox requests
+    friended_by = graph.friended_by(user_id)
+    bl_groups   = [g for g in graph.groups.get(user_id, ()) if str(g) in checker.blacklisted_groups]
+
+    embed = discord.Embed(
+        title=f"Who Knows — {username}",
+        color=discord.Color.red() if friended_by or bl_groups else discord.Color.green(),
+        timestamp=datetime.now()
+    )
+    embed.add_field(name="Target", value=f"[{username}]({profile_url}) | `{user_id}`", inline=False)
+    embed.add_field(
+        name=f"Friend Of ({len(friended_by)})",
+        value=join_links(friended_by) if friended_by else "No checked users",
+        inline=False
+    )
+    for gid in bl_groups[:5]:
+        others = [uid for uid in graph.members_of(gid) if uid != user_id]
+        embed.add_field(
+            name=f"Shares Blacklisted Group {checker.catalog.name(gid)} ({len(others)})",
+            value=join_links(others) if others else "No other checked users",
+            inline=False
+        )
+    embed.set_footer(text=f"Index: {len(graph.friends)} friend list(s), {len(graph.groups)} group list(s)")
+
+    await interaction.followup.send(embed=embed)
+
+
+@bot.tree.command(name="history", description="Look up past background checks without re-running them")
+@app_commands.describe(
+    user="Roblox user ID or username to show the last result for",
+    moderator="Only checks run by this moderator",
+    days="Only checks from the last N days",
+    export="Attach every matching check as a CSV file"
+)
+async def check_history(interaction: discord.Interaction, user: Optional[str] = None,
+                        moderator: Optional[discord.User] = None, days: Optional[int] = None,
+                        export: bool = False):
+    # Served entirely from the local history store — no Roblox requests
+    rows = await run_blocking(lambda: history.query(
+        user,
+        moderator.id if moderator else None,
+        time.time() - days * 86400 if days else None,
+        limit=None if export else HISTORY_LIMIT
+    ))
+
+    if not rows:
+        await interaction.response.send_message("No matching checks in the history.")
+        return
+
+    if export:
+        data = io.BytesIO(CheckHistory.to_csv(rows).encode('utf-8'))
+        await interaction.response.send_message(
+            f"📄 {len(rows)} check(s)", file=discord.File(data, filename="check_history.csv")
+        )
+        return
+
+    def line(r: Dict) -> str:
+        mark = "✅" if r['passed'] else "❌"
+        fast = " · fast verdict" if not r['complete'] else ""
+        return (f"{mark} <t:{int(r['checked_at'])}:R> [{r['username']}]({ROBLOX_PROFILE_URL.format(r['roblox_id'])})"
+                f" | `{r['roblox_id']}` · <@{r['moderator_id']}>{fast}")
+
+    if not user:
+        embed = discord.Embed(title=f"Recent Checks ({len(rows)})", description="\n".join(map(line, rows)),
+                              color=discord.Color.blurple())
+        await interaction.response.send_message(embed=embed)
+        return
+
+    last = rows[0]
+    hits = last['hits']
+    sources = [name for name, hit in (("DHS", hits['dhs']), ("HoR", hits['hor']), ("Senate", hits['senate'])) if hit]
+    if hits['groups']:
+        sources.append(f"{len(hits['groups'])} blacklisted group(s)")
+
+    embed = discord.Embed(
+        title=f"Last Check — {last['username']}",
+        color=discord.Color.green() if last['passed'] else discord.Color.red(),
+        timestamp=datetime.fromtimestamp(last['checked_at'])
+    )
+    embed.add_field(name="Target",    value=f"[{last['username']}]({ROBLOX_PROFILE_URL.format(last['roblox_id'])}) | `{last['roblox_id']}`", inline=False)
+    embed.add_field(name="Result",    value=("✅ Passed" if last['passed'] else "❌ Failed") + (" (fast verdict)" if not last['complete'] else ""), inline=True)
+    embed.add_field(name="Agent",     value=f"<@{last['moderator_id']}>", inline=True)
+    embed.add_field(name="Checked",   value=f"<t:{int(last['checked_at'])}:R> in {last['elapsed_ms'] or 0:.0f} ms", inline=True)
+    embed.add_field(name="Source Hits", value=", ".join(sources) or "None", inline=False)
+    embed.add_field(name="Factors",   value="\n".join(f"• {f}" for f in last['factors']) or "None", inline=False)
+    if len(rows) > 1:
+        # Up to HISTORY_LIMIT - 1 lines overflow a 1024-character field; the description holds 4096
+        embed.description = "**Earlier Checks**\n" + "\n".join(map(line, rows[1:]))
+    embed.set_footer(text="From check history — run /background-check for a fresh result")
+
+    await interaction.response.send_message(embed=embed)
+
+
+@bot.tree.command(name="reload-blacklist", description="Reload all blacklist databases")
 async def reload_blacklist(interaction: discord.Interaction):
     await interaction.response.defer()
 
-    doc_ok    = await checker.fetch_blacklist()
-    dhs_ok    = await checker.fetch_dhs()
-    hor_ok    = await checker.fetch_hor()
-    senate_ok = await checker.fetch_senate()
+    results, changes = await reload_blacklists(refresh=True)
+    doc_ok    = results['groups']
+    dhs_ok    = results['dhs']
+    hor_ok    = results['hor']
+    senate_ok = results['senate']
 
+    named       = sum(1 for _, g in checker.catalog.items() if g['blacklisted'] and g['name'])
     dhs_active  = sum(1 for e in checker.dhs_by_id.values() if not e.get('removed'))
     dhs_removed = sum(1 for e in checker.dhs_by_id.values() if e.get('removed'))
     dhs_detail  = f"{dhs_active} active, {dhs_removed} removed" if GOOGLE_API_KEY else f"{len(checker.dhs_by_id)} entries (no API key — strikethrough detection disabled)"
 
     lines = [
-        f"{'✅' if doc_ok    else '❌'} Group blacklist — {len(checker.blacklisted_groups)} groups",
+        f"{'✅' if doc_ok    else '❌'} Group blacklist — {len(checker.blacklisted_groups)} groups ({named} named)",
         f"{'✅' if dhs_ok    else '❌'} DHS Database    — {dhs_detail}",
         f"{'✅' if hor_ok    else '❌'} HoR Database    — {len(checker.hor_by_id)} entries",
         f"{'✅' if senate_ok else '❌'} Senate Database — {len(checker.senate_by_id)} entries",
     ]
 
+    # Checked users who are friends with anyone whose blacklist status just changed
+    await run_blocking(checker.graph.refresh)
+    linked = {t for uid in changes['user_ids'] for t in checker.graph.friended_by(uid)}
+    if linked:
+        lines.append(f"🔗 {len(linked)} checked user(s) are friends with changed entries — see `/who-knows`")
+
     if not all([dhs_ok, hor_ok, senate_ok]):
         lines.append("\n⚠️ A sheet failed to load. Make sure it's set to **Anyone with the link → Viewer**.")
 
     await interaction.followup.send("\n".join(lines))
 
 
+# ── Sidecar process ────────────────────────────────────────────────────────────
+class SidecarHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in self.rfile:
+            try:
+                resp = self.server.dispatch(json.loads(line))
+            except Exception as e:
+                resp = {'error': str(e)}
+            self.wfile.write(json.dumps(resp).encode() + b'\n')
+            self.wfile.flush()
+
+
+class SidecarServer(socketserver.ThreadingTCPServer):
+    """Shared Roblox cache, rate limiter and blacklist refresher for worker processes."""
+
+    daemon_threads      = True
+    allow_reuse_address = True
+
+    def __init__(self, address):
+        super().__init__(address, SidecarHandler)
+        self.cache       = TTLCache(ROBLOX_CACHE_TTL, max_size=SIDECAR_CACHE_SIZE, stale_ttl=ROBLOX_STALE_TTL)
+        self.cache_lock  = threading.Lock()
+        self.limiter     = RateLimiter(SIDECAR_RATE_PER_SECOND, SIDECAR_RATE_BURST)
+        self.checker     = RobloxChecker(graph_path=None)
+        self.reload_lock = threading.Lock()
+
+    def refresh_blacklists(self) -> Dict[str, bool]:
+        with self.reload_lock:
+            results, _ = asyncio.run(self.checker.reload_all())
+            self.checker.write_snapshot(BLACKLIST_SNAPSHOT_PATH)
+            return results
+
+    def dispatch(self, req: Dict) -> Dict:
+        op = req.get('op')
+        if op == 'get':
+            with self.cache_lock:
+                if req.get('stale'):
+                    value, stored_at = self.cache.get_stale(req['key']) or (None, None)
+                    return {'value': value, 'stored_at': stored_at}
+                return {'value': self.cache.get(req['key']), 'stored_at': self.cache.stored_at(req['key'])}
+        if op == 'set':
+            with self.cache_lock:
+                self.cache.set(req['key'], req.get('value'))
+            return {}
+        if op == 'invalidate':
+            with self.cache_lock:
+                self.cache.invalidate(req['key'])
+            return {}
+        if op == 'acquire':
+            return {'wait': self.limiter.reserve()}
+        if op == 'reload':
+            return {'results': self.refresh_blacklists()}
+        return {'error': f"unknown op {op!r}"}
+
+
+def run_sidecar():
+    host, _, port = (ROBLOX_SIDECAR or "127.0.0.1:8765").rpartition(':')
+    server = SidecarServer((host or '127.0.0.1', int(port)))
+    server.refresh_blacklists()
+
+    def refresh_loop():
+        while True:
+            time.sleep(BLACKLIST_REFRESH_MINUTES * 60)
+            try:
+                server.refresh_blacklists()
+            except Exception as e:
+                print(f"[Sidecar] Refresh error: {e}")
+
+    threading.Thread(target=refresh_loop, daemon=True).start()
+    print(f"[Sidecar] Listening on {server.server_address[0]}:{server.server_address[1]}")
+    server.serve_forever()
+
+
+# ── HTTP interactions ──────────────────────────────────────────────────────────
+INTERACTION_PING         = 1
+INTERACTION_COMMAND      = 2
+INTERACTION_COMPONENT    = 3
+INTERACTION_AUTOCOMPLETE = 4
+
+RESPONSE_PONG          = 1
+RESPONSE_MESSAGE       = 4
+RESPONSE_DEFER_MESSAGE = 5
+RESPONSE_DEFER_UPDATE  = 6
+RESPONSE_UPDATE        = 7
+RESPONSE_AUTOCOMPLETE  = 8
+
+EPHEMERAL_FLAG = 64
+MISSING        = discord.utils.MISSING
+
+http_views = {}      # custom_id -> (view, item, expires) for buttons this worker sent
+http_tasks = set()   # running handlers, kept so they aren't collected
+
+# Autocomplete callbacks by parameter name — app_commands only says whether a parameter has one
+http_autocomplete = {'user': target_autocomplete}
+
+
+def register_http_view(view: discord.ui.View):
+    """Remember a sent view's buttons; clicks come back to whichever worker Discord picks."""
+    now = time.monotonic()
+    for custom_id, (old, _, expires) in list(http_views.items()):
+        if expires < now or old.is_finished():
+            del http_views[custom_id]
+    expires = now + (view.timeout or INTERACTION_LIFETIME)
+    for item in view.children:
+        custom_id = getattr(item, 'custom_id', None)
+        if custom_id:
+            http_views[custom_id] = (view, item, expires)
+
+
+def message_payload(content=MISSING, embed=MISSING, view=MISSING, file=MISSING, ephemeral=False) -> tuple:
+    """(message JSON, attached files) for an interaction response or webhook call."""
+    data, files = {}, []
+    if content is not MISSING:
+        data['content'] = content
+    if embed is not MISSING:
+        data['embeds'] = [embed.to_dict()] if embed else []
+    if view is not MISSING:
+        data['components'] = view.to_components() if view else []
+        if view:
+            register_http_view(view)
+    if file:
+        files = [file]
+        data['attachments'] = [{'id': 0, 'filename': file.filename}]
+    if ephemeral:
+        data['flags'] = EPHEMERAL_FLAG
+    return data, files
+
+
+def multipart_body(data: Dict, files: List) -> aiohttp.FormData:
+    form = aiohttp.FormData()
+    form.add_field('payload_json', json.dumps(data), content_type='application/json')
+    for i, file in enumerate(files):
+        form.add_field(f'files[{i}]', file.fp, filename=file.filename,
+                       content_type='application/octet-stream')
+    return form
+
+
+class HttpUser:
+    def __init__(self, data: Dict):
+        self.id   = int(data.get('id', 0))
+        self.name = data.get('username', '')
+
+    @property
+    def mention(self) -> str:
+        return f"<@{self.id}>"
+
+
+class HttpInteractionResponse:
+    """
+    `interaction.response` for HTTP interactions. The first response is
+    handed back as the body of Discord's POST; if the handler hasn't
+    answered by HTTP_DEFER_AFTER the worker defers for it, and later
+    responses become webhook calls.
+    """
+
+    def __init__(self, interaction: 'HttpInteraction'):
+        self._parent       = interaction
+        self.reply         = asyncio.get_running_loop().create_future()   # (JSON, files)
+        self.auto_deferred = False
+
+    def is_done(self) -> bool:
+        return self.reply.done()
+
+    def _send(self, kind: int, data: Optional[Dict] = None, files: List = ()):
+        if self.reply.done():
+            raise discord.InteractionResponded(self._parent)
+        self.reply.set_result(({'type': kind, 'data': data} if data is not None else {'type': kind}, list(files)))
+
+    def auto_defer(self):
+        self.auto_deferred = True
+        if self._parent.type == INTERACTION_AUTOCOMPLETE:
+            self._send(RESPONSE_AUTOCOMPLETE, {'choices': []})
+        elif self._parent.type == INTERACTION_COMPONENT:
+            self._send(RESPONSE_DEFER_UPDATE)
+        else:
+            self._send(RESPONSE_DEFER_MESSAGE)
+
+    async def defer(self, *, ephemeral: bool = False, thinking: bool = False):
+        if self.auto_deferred:
+            return   # the worker already deferred for a slow handler
+        if self._parent.type == INTERACTION_COMPONENT and not thinking:
+            self._send(RESPONSE_DEFER_UPDATE)
+        else:
+            self._send(RESPONSE_DEFER_MESSAGE, {'flags': EPHEMERAL_FLAG} if ephemeral else None)
+
+    async def send_message(self, content=None, *, embed=MISSING, view=MISSING, file=MISSING, ephemeral=False):
+        if self.auto_deferred:
+            return await self._parent.followup.send(content, embed=embed, view=view, file=file, ephemeral=ephemeral)
+        self._send(RESPONSE_MESSAGE, *message_payload(content, embed, view, file, ephemeral))
+
+    async def edit_message(self, content=MISSING, *, embed=MISSING, view=MISSING):
+        if self.auto_deferred:
+            return await self._parent.edit_original_response(content=content, embed=embed, view=view)
+        self._send(RESPONSE_UPDATE, *message_payload(content, embed, view))
+
+    async def autocomplete(self, choices: List[app_commands.Choice]):
+        self._send(RESPONSE_AUTOCOMPLETE, {'choices': [{'name': c.name, 'value': c.value} for c in choices[:25]]})
+
+
+class HttpFollowup:
+    def __init__(self, interaction: 'HttpInteraction'):
+        self._parent = interaction
+
+    async def send(self, content=MISSING, *, embed=MISSING, view=MISSING, file=MISSING, ephemeral=False):
+        await self._parent.webhook('POST', '', *message_payload(content, embed, view, file, ephemeral))
+
+
+class HttpInteraction:
+    """
+    The parts of discord.Interaction the command handlers use, for an
+    interaction posted over HTTP. Followups and edits go through the
+    interaction's webhook, which needs no bot session.
+    """
+
+    def __init__(self, payload: Dict, session: aiohttp.ClientSession):
+        self.id             = int(payload['id'])
+        self.type           = payload['type']
+        self.token          = payload['token']
+        self.application_id = int(payload['application_id'])
+        self.data           = payload.get('data') or {}
+        self.guild_id       = int(payload['guild_id']) if payload.get('guild_id') else None
+        self.channel_id     = int(payload['channel_id']) if payload.get('channel_id') else None
+        self.user           = HttpUser((payload.get('member') or {}).get('user') or payload.get('user') or {})
+        self.created_at     = discord.utils.snowflake_time(self.id)
+        self.session        = session
+        self.response       = HttpInteractionResponse(self)
+        self.followup       = HttpFollowup(self)
+
+    async def webhook(self, method: str, path: str, data: Dict, files: List = ()):
+        url = f"{DISCORD_API_BASE}/webhooks/{self.application_id}/{self.token}{path}"
+        if files:
+            request = self.session.request(method, url, data=multipart_body(data, files))
+        else:
+            request = self.session.request(method, url, json=data)
+        async with request as resp:
+            if resp.status >= 400:
+                raise discord.HTTPException(resp, await resp.text())
+
+    async def edit_original_response(self, content=MISSING, *, embed=MISSING, view=MISSING):
+        await self.webhook('PATCH', '/messages/@original', *message_payload(content, embed, view))
+
+
+async def dispatch_http_interaction(interaction: HttpInteraction):
+    """Run the slash command, autocomplete or button callback an HTTP interaction is for."""
+    data = interaction.data
+    try:
+        if interaction.type == INTERACTION_COMPONENT:
+            view, item, expires = http_views.get(data.get('custom_id'), (None, None, 0))
+            if view is None or view.is_finished() or time.monotonic() > expires:
+                await interaction.response.send_message(
+                    "⌛ This button has expired or was sent by another worker — run the command again.",
+                    ephemeral=True)
+                return
+            await item.callback(interaction)
+            return
+
+        command = bot.tree.get_command(data.get('name', ''))
+        if command is None:
+            raise LookupError(f"unknown command {data.get('name')!r}")
+        options = data.get('options', [])
+
+        if interaction.type == INTERACTION_AUTOCOMPLETE:
+            focused = next((o for o in options if o.get('focused')), {})
+            name    = focused.get('name', '')
+            param   = command.get_parameter(name)
+            choices = []
+            if param is not None and param.autocomplete and name in http_autocomplete:
+                choices = await http_autocomplete[name](interaction, str(focused.get('value', '')))
+            await interaction.response.autocomplete(choices)
+        else:
+            users = data.get('resolved', {}).get('users', {})
+            await command.callback(interaction, **{
+                o['name']: HttpUser(users.get(o['value'], {'id': o['value']}))
+                           if o.get('type') == discord.AppCommandOptionType.user.value else o.get('value')
+                for o in options
+            })
+    except Exception as e:
+        print(f"[HTTP] Error handling {data.get('name') or data.get('custom_id')}: {e}")
+        if interaction.type == INTERACTION_AUTOCOMPLETE:
+            return
+        try:
+            if interaction.response.is_done():
+                await interaction.followup.send(f"❌ An error occurred: {str(e)}", ephemeral=True)
+            else:
+                await interaction.response.send_message(f"❌ An error occurred: {str(e)}", ephemeral=True)
+        except Exception as e:
+            print(f"[HTTP] Error reporting failure: {e}")
+
+
+async def serve_http_interactions(token: Optional[str]):
+    try:
+        from nacl.signing import VerifyKey
+        from nacl.exceptions import BadSignatureError
+    except ImportError:
+        print("[HTTP] --http needs PyNaCl to verify request signatures (pip install PyNaCl)")
+        return
+    from aiohttp import web
+
+    if not DISCORD_PUBLIC_KEY:
+        print("[HTTP] Set DISCORD_PUBLIC_KEY to the application's public key")
+        return
+    verify_key = VerifyKey(bytes.fromhex(DISCORD_PUBLIC_KEY))
+
+    # REST login only (no gateway session) — it's what command sync needs
+    if token:
+        await bot.login(token)
+        startup['sync'] = asyncio.create_task(sync_commands())
+    else:
+        print("[HTTP] No DISCORD_BOT_TOKEN — serving without syncing slash commands")
+
+    await load_blacklist_snapshot()
+    startup['refresh'] = asyncio.create_task(refresh_blacklists())
+    if checker.sidecar:
+        snapshot_watcher.start()
+
+    # Alerts go out through the REST login, so the designated sweeper needs the token
+    if HTTP_WATCH_SWEEPER and token:
+        watch_sweeper.start()
+    elif HTTP_WATCH_SWEEPER:
+        print("[HTTP] HTTP_WATCH_SWEEPER needs DISCORD_BOT_TOKEN to post alerts — not sweeping")
+
+    session = aiohttp.ClientSession()
+
+    async def interactions(request: web.Request) -> web.Response:
+        body      = await request.read()
+        timestamp = request.headers.get('X-Signature-Timestamp', '')
+        try:
+            verify_key.verify(timestamp.encode() + body, bytes.fromhex(request.headers.get('X-Signature-Ed25519', '')))
+        except (BadSignatureError, ValueError):
+            return web.Response(status=401, text="invalid request signature")
+        if not timestamp.isdigit() or abs(time.time() - int(timestamp)) > HTTP_SIGNATURE_MAX_AGE:
+            return web.Response(status=401, text="stale request signature")
+
+        payload = json.loads(body)
+        if payload.get('type') == INTERACTION_PING:
+            return web.json_response({'type': RESPONSE_PONG})
+
+        interaction = HttpInteraction(payload, session)
+        task = asyncio.create_task(dispatch_http_interaction(interaction))
+        http_tasks.add(task)
+        task.add_done_callback(http_tasks.discard)
+
+        await asyncio.wait({interaction.response.reply, task}, timeout=HTTP_DEFER_AFTER,
+                           return_when=asyncio.FIRST_COMPLETED)
+        if not interaction.response.is_done():
+            interaction.response.auto_defer()
+        reply, files = interaction.response.reply.result()
+        if files:
+            return web.Response(body=multipart_body(reply, files)())
+        return web.json_response(reply)
+
+    async def health(request: web.Request) -> web.Response:
+        return web.json_response({'handlers': len(http_tasks)})
+
+    app = web.Application()
+    app.router.add_post(HTTP_INTERACTIONS_PATH, interactions)
+    app.router.add_get('/healthz', health)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, HTTP_INTERACTIONS_HOST, HTTP_INTERACTIONS_PORT).start()
+    print(f"[HTTP] Serving interactions on http://{HTTP_INTERACTIONS_HOST}:{HTTP_INTERACTIONS_PORT}{HTTP_INTERACTIONS_PATH}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await runner.cleanup()
+        await session.close()
+        if token:
+            await bot.close()
+
+
+def parse_test_interaction(args: List[str]) -> Dict:
+    """
+    Interaction JSON for `--http-send`:
+      background-check user=Builderman full=true    slash command
+      autocomplete background-check user=Build      autocomplete for the last option
+      button <custom_id>                            button click
+    """
+    guild_id = str(DEV_GUILD_ID or 1)
+    payload  = {
+        'id':             str(discord.utils.time_snowflake(discord.utils.utcnow())),
+        'application_id': str(bot.application_id or 1),
+        'token':          os.urandom(16).hex(),
+        'guild_id':       guild_id,
+        'channel_id':     guild_id,
+        'member':         {'user': {'id': "1", 'username': "http-send"}},
+    }
+    if args[0] == 'button':
+        return {**payload, 'type': INTERACTION_COMPONENT, 'data': {'custom_id': args[1], 'component_type': 2}}
+
+    kind = INTERACTION_AUTOCOMPLETE if args[0] == 'autocomplete' else INTERACTION_COMMAND
+    if kind == INTERACTION_AUTOCOMPLETE:
+        args = args[1:]
+    command = bot.tree.get_command(args[0])
+    if command is None:
+        raise SystemExit(f"Unknown command {args[0]!r}")
+
+    options, users = [], {}
+    for arg in args[1:]:
+        name, _, value = arg.partition('=')
+        param = command.get_parameter(name)
+        if param is None:
+            raise SystemExit(f"/{command.name} has no option {name!r}")
+        if param.type == discord.AppCommandOptionType.boolean:
+            value = value.lower() in ("1", "true", "yes")
+        elif param.type == discord.AppCommandOptionType.integer:
+            value = int(value)
+        elif param.type == discord.AppCommandOptionType.number:
+            value = float(value)
+        elif param.type == discord.AppCommandOptionType.user:
+            users[value] = {'id': value, 'username': f"user-{value}"}
+        options.append({'name': name, 'type': param.type.value, 'value': value})
+    if kind == INTERACTION_AUTOCOMPLETE and options:
+        options[-1]['focused'] = True
+    return {**payload, 'type': kind,
+            'data': {'name': command.name, 'type': 1, 'options': options, 'resolved': {'users': users}}}
+
+
+async def send_test_interaction(args: List[str]):
+    """
+    Sign and post one interaction to a local --http worker and print the
+    reply. Start the worker with DISCORD_API_BASE=http://127.0.0.1:<port> and
+    the webhook calls it makes (followups, edits) are printed here as well.
+    """
+    from nacl.signing import SigningKey
+    from aiohttp import web
+
+    if not HTTP_TEST_SIGNING_KEY:
+        key = SigningKey.generate()
+        print("Set these to send test interactions (the public key goes to the worker):")
+        print(f"  HTTP_TEST_SIGNING_KEY={key.encode().hex()}")
+        print(f"  DISCORD_PUBLIC_KEY={key.verify_key.encode().hex()}")
+        return
+    if not args:
+        print(parse_test_interaction.__doc__)
+        return
+    key     = SigningKey(bytes.fromhex(HTTP_TEST_SIGNING_KEY))
+    payload = parse_test_interaction(args)
+
+    # Stand in for Discord's webhook API when it points at this machine
+    last_call = [time.monotonic()]
+    runner    = None
+    api       = urlsplit(DISCORD_API_BASE)
+    if api.hostname in ("127.0.0.1", "localhost"):
+        async def webhook(request: web.Request) -> web.Response:
+            last_call[0] = time.monotonic()
+            if request.content_type == 'multipart/form-data':
+                fields = {}
+                async for part in await request.multipart():
+                    fields[part.name] = await part.read()
+                data = json.loads(fields.pop('payload_json', b'{}'))
+                data['files'] = {name: len(content) for name, content in fields.items()}
+            else:
+                data = await request.json() if request.can_read_body else {}
+            print(f"[HTTP] Webhook {request.method} …{request.path.rsplit('/', 1)[-1]}")
+            print(json.dumps(data, indent=2, ensure_ascii=False))
+            return web.json_response({'id': payload['id']})
+
+        app = web.Application()
+        app.router.add_route('*', '/{tail:.*}', webhook)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        await web.TCPSite(runner, api.hostname, api.port or 80).start()
+
+    body      = json.dumps(payload).encode()
+    timestamp = str(int(time.time()))
+    headers   = {
+        'Content-Type':          'application/json',
+        'X-Signature-Ed25519':   key.sign(timestamp.encode() + body).signature.hex(),
+        'X-Signature-Timestamp': timestamp,
+    }
+    url = f"http://127.0.0.1:{HTTP_INTERACTIONS_PORT}{HTTP_INTERACTIONS_PATH}"
+    try:
+        async with aiohttp.ClientSession() as session:
+            async with session.post(url, data=body, headers=headers) as resp:
+                print(f"[HTTP] Reply {resp.status}")
+                if resp.content_type == 'application/json':
+                    print(json.dumps(await resp.json(), indent=2, ensure_ascii=False))
+                else:
+                    print(await resp.text())
+    except aiohttp.ClientConnectionError as e:
+        print(f"[HTTP] No worker at {url}: {e}")
+        last_call[0] = 0
+
+    if runner:
+        while time.monotonic() - last_call[0] < HTTP_SEND_IDLE:
+            await asyncio.sleep(0.5)
+        await runner.cleanup()
+
+
 if __name__ == "__main__":
+    if "--sidecar" in sys.argv:
+        run_sidecar()
+        sys.exit(0)
+
+    if "--http-send" in sys.argv:
+        asyncio.run(send_test_interaction(sys.argv[sys.argv.index("--http-send") + 1:]))
+        sys.exit(0)
+
+    if ROBLOX_SIDECAR:
+        checker.use_sidecar(ROBLOX_SIDECAR)
+
+    startup['init_ms'] = (time.perf_counter() - STARTUP_STARTED) * 1000
+    print(f"[Startup] Initialised in {startup['init_ms']:.0f} ms")
+
     TOKEN = os.getenv("DISCORD_BOT_TOKEN", "YOUR_DISCORD_BOT_TOKEN_HERE")
 
-    if TOKEN == "YOUR_DISCORD_BOT_TOKEN_HERE" or not TOKEN:
+    if "--http" in sys.argv:
+        try:
+            asyncio.run(serve_http_interactions(None if TOKEN == "YOUR_DISCORD_BOT_TOKEN_HERE" else TOKEN))
+        except KeyboardInterrupt:
+            pass
+    elif TOKEN == "YOUR_DISCORD_BOT_TOKEN_HERE" or not TOKEN:
         print("\n⚠️  Set DISCORD_BOT_TOKEN in your .env file or Railway Variables tab.")
         print("    Get your token from: https://discord.com/developers/applications\n")
     else: